@@ -1,7 +1,8 @@
 """Base agent implementation for the FARSI simulation."""
 import sys
 import time
-from typing import Optional
+from typing import Optional, TextIO
+from config import TYPING_SPEED
 from logger import logger
 from exceptions import AgentCommunicationError, ValidationError
 from utils import validate_message
@@ -31,13 +32,17 @@ class AIAgent:
         self.expertise = expertise
         logger.info(f"Initialized {name} with role: {role}")
         
-    def speak(self, message: str, typing_speed: Optional[float] = 0.02):
+    def speak(self, message: str, typing_speed: Optional[float] = None,
+              stream: Optional[TextIO] = None, clock=None):
         """
         Display a message from the agent with a typing effect.
         
         Args:
             message: The text content to display
-            typing_speed: Delay between characters for typing effect (seconds)
+            typing_speed: Delay between characters for typing effect (seconds);
+                defaults to config.TYPING_SPEED
+            stream: Output stream to render to (defaults to sys.stdout)
+            clock: Object providing time()/sleep() (defaults to the time module)
             
         Raises:
             AgentCommunicationError: If there's an error during message display
@@ -46,28 +51,35 @@ class AIAgent:
         try:
             # Validate message
             message = validate_message(message)
+            if stream is None:
+                stream = sys.stdout
+            if clock is None:
+                clock = time
+            if typing_speed is None:
+                typing_speed = TYPING_SPEED
             
             # Log the interaction
             logger.debug(f"{self.name} is preparing to speak: {message[:50]}...")
             
-            start_time = time.time()
+            start_time = clock.time()
             
             # Display agent identifier
-            print(f"\n[{self.name} - {self.role}]")
+            print(f"\n[{self.name} - {self.role}]", file=stream)
             
             # Simulate typing effect
             for char in message:
                 try:
-                    sys.stdout.write(char)
-                    sys.stdout.flush()
-                    time.sleep(typing_speed)
+                    stream.write(char)
+                    stream.flush()
+                    if typing_speed:
+                        clock.sleep(typing_speed)
                 except IOError as e:
                     raise AgentCommunicationError(f"Error during message display: {e}")
                     
-            print("\n")
+            print("\n", file=stream)
             
             # Calculate response time
-            response_time = time.time() - start_time
+            response_time = clock.time() - start_time
             
             # Log completion
             logger.debug(f"{self.name} finished speaking. Response time: {response_time:.2f}s")
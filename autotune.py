@@ -0,0 +1,246 @@
+"""
+Parameter autotuner for the FARSI simulation.
+
+Runs the demonstration headless on a virtual clock, searches the setting
+space with successive halving and writes the best configuration out as an
+override profile that config.py applies on import.
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import AUTOTUNE_MIN_SETTINGS, PROFILE_FILE, TUNABLE_SETTINGS
+from exceptions import ValidationError
+from farsi_simulation import FARSISimulation
+from logger import logger
+from utils import VirtualClock, percentile
+
+OBJECTIVES = ('duration', 'p99_latency', 'cpu')
+# Measured on a virtual clock, so repeating a run never changes the result.
+# They only shrink as pacing shrinks, so they are searched against a target.
+DETERMINISTIC_OBJECTIVES = ('duration', 'p99_latency')
+
+DEFAULT_SEARCH_SPACE: Dict[str, List[float]] = {
+    'TYPING_SPEED': [0.0, 0.005, 0.01, 0.02, 0.03, 0.05],
+    'PAUSE_BETWEEN_AGENTS': [0.0, 0.25, 0.5, 1.0, 2.0]
+}
+
+
+def evaluate_config(settings: Dict[str, float], repetitions: int = 1,
+                    scheduler_policy: Optional[str] = None,
+                    generation_latency: Optional[Dict[str, float]] = None,
+                    priorities: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+    """
+    Measure a configuration by running the demonstration headless.
+
+    Args:
+        settings: Values for some or all of config.TUNABLE_SETTINGS
+        repetitions: Number of demonstrations to run (the evaluation budget)
+        scheduler_policy: Override for SCHEDULER_POLICY
+        generation_latency: Per-agent generation latency overrides (seconds)
+        priorities: Per-agent scheduling priority overrides
+
+    Returns:
+        Mean simulated duration, p99 turn latency and mean CPU seconds per run
+
+    Raises:
+        ValidationError: If settings contain keys that cannot be tuned
+    """
+    unknown = set(settings) - set(TUNABLE_SETTINGS)
+    if unknown:
+        raise ValidationError(f"Cannot tune settings: {sorted(unknown)}")
+
+    durations, latencies = [], []
+    cpu_start = time.process_time()
+    for _ in range(repetitions):
+        simulation = FARSISimulation(
+            typing_speed=settings.get('TYPING_SPEED'),
+            pause_between_agents=settings.get('PAUSE_BETWEEN_AGENTS'),
+            clock=VirtualClock(),
+            headless=True,
+            scheduler_policy=scheduler_policy,
+            generation_latency=generation_latency,
+            priorities=priorities,
+            require_api_keys=False
+        )
+        simulation.run_demonstration(save_metrics=False)
+        durations.append(simulation.metrics.get_summary()['duration_seconds'])
+        for metrics in simulation.metrics.agent_metrics.values():
+            latencies.extend(metrics.response_times)
+
+    return {
+        'duration': sum(durations) / repetitions,
+        'p99_latency': percentile(latencies, 99),
+        'cpu': (time.process_time() - cpu_start) / repetitions
+    }
+
+
+@dataclass
+class TuningResult:
+    """Outcome of an autotuning run."""
+    settings: Dict[str, float]
+    score: float
+    measurements: Dict[str, float]
+    trials: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class Autotuner:
+    """Successive-halving search over simulation settings."""
+
+    def __init__(self, search_space: Optional[Dict[str, List[float]]] = None,
+                 objective: str = 'duration', target: Optional[float] = None,
+                 evaluate: Callable[[Dict[str, float], int], Dict[str, float]] = evaluate_config,
+                 eta: int = 3, min_budget: int = 1,
+                 deterministic: Optional[bool] = None,
+                 minimums: Optional[Dict[str, float]] = None):
+        """
+        Initialize the autotuner.
+
+        Args:
+            search_space: Candidate values per setting (defaults to DEFAULT_SEARCH_SPACE)
+            objective: Measurement to optimize, one of OBJECTIVES
+            target: Minimize the distance to this value instead of the value
+                itself (e.g. a desired total duration); required for
+                DETERMINISTIC_OBJECTIVES
+            evaluate: Function measuring a configuration for a given budget
+            eta: Fraction of candidates dropped per round is 1 - 1/eta;
+                surviving candidates get eta times the budget
+            min_budget: Budget given to every candidate in the first round
+            deterministic: Whether repeated evaluations give identical
+                measurements; defaults to whether the objective is in
+                DETERMINISTIC_OBJECTIVES
+            minimums: Lowest value allowed per setting; candidates below it are
+                skipped (defaults to config.AUTOTUNE_MIN_SETTINGS)
+
+        Raises:
+            ValidationError: If the objective, target or halving parameters are
+                invalid, or no candidate meets the minimums
+        """
+        if objective not in OBJECTIVES:
+            raise ValidationError(f"Unknown objective {objective}; expected one of {OBJECTIVES}")
+        if objective in DETERMINISTIC_OBJECTIVES and target is None:
+            raise ValidationError(f"Objective {objective} needs a target; minimizing it only "
+                                  f"selects the lowest settings")
+        if eta < 2 or min_budget < 1:
+            raise ValidationError("eta must be at least 2 and min_budget at least 1")
+
+        self.search_space = search_space or DEFAULT_SEARCH_SPACE
+        self.objective = objective
+        self.target = target
+        self.evaluate = evaluate
+        self.eta = eta
+        self.min_budget = min_budget
+        self.deterministic = (
+            objective in DETERMINISTIC_OBJECTIVES if deterministic is None else deterministic
+        )
+        self.minimums = AUTOTUNE_MIN_SETTINGS if minimums is None else minimums
+        if not self.candidates():
+            raise ValidationError(f"No candidate settings meet the minimums {self.minimums}")
+
+    def candidates(self) -> List[Dict[str, float]]:
+        """
+        Enumerate the configurations in the search space that meet the minimums.
+
+        Returns:
+            List of setting dictionaries (the Cartesian product of the space)
+        """
+        names = list(self.search_space)
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(
+                [value for value in self.search_space[name]
+                 if value >= self.minimums.get(name, float('-inf'))]
+                for name in names
+            ))
+        ]
+
+    def score(self, measurements: Dict[str, float]) -> float:
+        """
+        Score measurements against the objective; lower is better.
+
+        Args:
+            measurements: Dictionary returned by the evaluate function
+
+        Returns:
+            The objective value, or its distance to the target if one is set
+        """
+        value = measurements[self.objective]
+        return abs(value - self.target) if self.target is not None else value
+
+    def run(self) -> TuningResult:
+        """
+        Search the space with successive halving.
+
+        Every candidate is evaluated with the minimum budget, the best 1/eta
+        survive, and survivors are re-evaluated with eta times the budget
+        until a single configuration remains. For deterministic objectives a
+        larger budget would only repeat identical runs, so the first round's
+        ranking is final.
+
+        Returns:
+            Best configuration with its score, measurements and all trials
+        """
+        survivors = self.candidates()
+        budget = self.min_budget
+        trials: List[Dict[str, Any]] = []
+        ranked: List[Tuple[float, int, Dict[str, float]]] = []
+
+        while True:
+            ranked = []
+            for index, settings in enumerate(survivors):
+                measurements = self.evaluate(settings, budget)
+                score = self.score(measurements)
+                ranked.append((score, index, measurements))
+                trials.append({'settings': settings, 'budget': budget,
+                               'score': score, 'measurements': measurements})
+            ranked.sort(key=lambda item: (item[0], item[1]))
+            logger.info(f"Autotune round with budget {budget}: {len(survivors)} candidates, "
+                        f"best score {ranked[0][0]:.4f}")
+
+            if len(survivors) == 1 or self.deterministic:
+                break
+            keep = max(1, len(survivors) // self.eta)
+            survivors = [survivors[index] for _, index, _ in ranked[:keep]]
+            budget *= self.eta
+
+        best_score, best_index, best_measurements = ranked[0]
+        return TuningResult(survivors[best_index], best_score, best_measurements, trials)
+
+
+def write_profile(settings: Dict[str, float], path: str = PROFILE_FILE):
+    """
+    Write settings as a config.py override profile.
+
+    Args:
+        settings: Setting overrides to persist
+        path: Profile file path
+    """
+    with open(path, 'w') as f:
+        json.dump(settings, f, indent=2)
+    logger.info(f"Wrote configuration profile to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autotune FARSI simulation settings")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='duration',
+                        help="measurement to optimize")
+    parser.add_argument('--target', type=float, default=None,
+                        help="aim for this value instead of minimizing the objective "
+                             "(required for duration and p99_latency)")
+    parser.add_argument('--eta', type=int, default=3, help="successive halving rate")
+    parser.add_argument('--output', default=PROFILE_FILE, help="override profile to write")
+    args = parser.parse_args()
+    if args.objective in DETERMINISTIC_OBJECTIVES and args.target is None:
+        parser.error(f"--target is required for --objective {args.objective}")
+
+    try:
+        result = Autotuner(objective=args.objective, target=args.target, eta=args.eta).run()
+        logger.info(f"Best settings: {result.settings} (score {result.score:.4f})")
+        write_profile(result.settings, args.output)
+    except Exception as e:
+        logger.critical(f"Fatal error in autotune: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,125 @@
+"""Incremental checkpointing for long-running FARSI simulations."""
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+from config import CHECKPOINT_FILE, CHECKPOINT_EVERY_TURNS, CHECKPOINT_EVERY_SECONDS
+from exceptions import CheckpointError
+from logger import logger
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointManager:
+    """Writes and restores simulation checkpoints every N turns or seconds."""
+
+    def __init__(self, path: str = CHECKPOINT_FILE,
+                 every_turns: Optional[int] = CHECKPOINT_EVERY_TURNS,
+                 every_seconds: Optional[float] = CHECKPOINT_EVERY_SECONDS):
+        """
+        Initialize the checkpoint manager.
+
+        Args:
+            path: File the checkpoint is written to
+            every_turns: Checkpoint after this many completed turns (None disables)
+            every_seconds: Checkpoint after this many seconds (None disables)
+
+        Raises:
+            CheckpointError: If an interval is not positive
+        """
+        if every_turns is not None and every_turns < 1:
+            raise CheckpointError("every_turns must be at least 1")
+        if every_seconds is not None and every_seconds <= 0:
+            raise CheckpointError("every_seconds must be positive")
+
+        self.path = path
+        self.every_turns = every_turns
+        self.every_seconds = every_seconds
+        self._last_turn = 0
+        self._last_time = time.time()
+
+    def should_checkpoint(self, turn_index: int) -> bool:
+        """
+        Check whether a checkpoint is due.
+
+        Args:
+            turn_index: Number of turns completed so far
+
+        Returns:
+            True if either the turn or the time interval has elapsed
+        """
+        if self.every_turns is not None and turn_index - self._last_turn >= self.every_turns:
+            return True
+        if self.every_seconds is not None and time.time() - self._last_time >= self.every_seconds:
+            return True
+        return False
+
+    def save(self, state: Dict[str, Any]) -> str:
+        """
+        Atomically write a checkpoint.
+
+        The state is written to a temporary file in the checkpoint directory
+        and then renamed over the previous checkpoint, so a crash mid-write
+        never leaves a truncated file behind.
+
+        Args:
+            state: Serializable simulation state; must contain 'turn_index'
+
+        Returns:
+            Path of the written checkpoint
+
+        Raises:
+            CheckpointError: If the checkpoint cannot be written
+        """
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        payload = dict(state, version=CHECKPOINT_VERSION)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise CheckpointError(f"Failed to write checkpoint {self.path}: {str(e)}")
+
+        self._last_turn = state.get('turn_index', self._last_turn)
+        self._last_time = time.time()
+        logger.debug(f"Checkpoint written to {self.path} at turn {self._last_turn}")
+        return self.path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the last checkpoint.
+
+        Returns:
+            The checkpoint state, or None if no checkpoint exists
+
+        Raises:
+            CheckpointError: If the checkpoint is unreadable or from another version
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CheckpointError(f"Failed to read checkpoint {self.path}: {str(e)}")
+
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint version: {state.get('version')}")
+
+        self._last_turn = state.get('turn_index', 0)
+        self._last_time = time.time()
+        return state
+
+    def clear(self):
+        """Remove the checkpoint file, e.g. after a run completes."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,7 +1,10 @@
 """Configuration settings for the FARSI simulation."""
+import json
 import os
 from typing import Dict, Any
 from dotenv import load_dotenv
+from exceptions import ConfigurationError
+from logger import logger
 
 # Load environment variables
 load_dotenv()
@@ -10,6 +13,31 @@ load_dotenv()
 TYPING_SPEED = 0.02  # seconds between characters
 PAUSE_BETWEEN_AGENTS = 1.0  # seconds between agent messages
 
+# Checkpoint settings
+CHECKPOINT_FILE = 'checkpoints/farsi_checkpoint.json'
+CHECKPOINT_EVERY_TURNS = 1  # write a checkpoint after this many turns (None disables)
+CHECKPOINT_EVERY_SECONDS = 60.0  # or after this many seconds (None disables)
+
+# Conversation history index settings
+HISTORY_INDEX_MAX_TURNS = 512  # oldest turns are evicted beyond this
+HISTORY_INDEX_NUM_PERM = 64  # MinHash permutations per turn
+HISTORY_INDEX_BANDS = 32  # LSH bands (must divide HISTORY_INDEX_NUM_PERM)
+HISTORY_CONTEXT_TURNS = 3  # relevant earlier turns fetched per prompt
+
+# Turn scheduler settings
+SCHEDULER_POLICY = 'round_robin'  # round_robin, earliest_ready or moderator
+SCHEDULER_MAX_CONSECUTIVE = 2  # turns an agent may take in a row while others are ready
+SCHEDULER_TURN_DEADLINE_SECONDS = None  # speak-by deadline after generation starts (None disables)
+
+# Distributed sweep settings
+SWEEP_HOST = '127.0.0.1'
+SWEEP_PORT = 5757
+SWEEP_LEASE_SECONDS = 30.0  # work is reassigned if not renewed within this time
+SWEEP_HEARTBEAT_SECONDS = 5.0  # how often workers renew their lease
+
+# Providers whose APIs accept explicit prompt-cache markers on a stable prefix
+PROMPT_CACHING_PROVIDERS = ('ANTHROPIC',)
+
 # API Configuration
 API_KEYS: Dict[str, str] = {
     'OPENAI': os.getenv('OPENAI_API_KEY', ''),
@@ -26,6 +54,10 @@ def validate_api_keys() -> bool:
     return all(API_KEYS.values())
 
 # Agent configuration
+# Optional per-agent keys: 'priority' (higher speaks first among ready agents),
+# 'deadline' (seconds after generation starts by which a turn should be spoken,
+# overriding SCHEDULER_TURN_DEADLINE_SECONDS) and 'generation_latency' (seconds
+# the provider stub takes to prepare a turn)
 AGENT_CONFIG: Dict[str, Dict[str, Any]] = {
     'zeta': {
         'class': 'ModeratorAgent',
@@ -52,3 +84,47 @@ AGENT_CONFIG: Dict[str, Dict[str, Any]] = {
         'api_provider': 'EMERGENCEAI'
     }
 }
+
+# Settings an override profile (e.g. one written by autotune.py) may change
+PROFILE_FILE = os.getenv('FARSI_PROFILE', 'config_profile.json')
+TUNABLE_SETTINGS = ('TYPING_SPEED', 'PAUSE_BETWEEN_AGENTS')
+# Lowest values the autotuner may choose, so the demo stays readable
+AUTOTUNE_MIN_SETTINGS = {'TYPING_SPEED': 0.01, 'PAUSE_BETWEEN_AGENTS': 0.25}
+
+def load_profile(path: str = PROFILE_FILE) -> Dict[str, Any]:
+    """
+    Load setting overrides from a JSON profile.
+    
+    Args:
+        path: Profile file path
+        
+    Returns:
+        Dictionary of overrides, empty if the profile does not exist
+        
+    Raises:
+        ConfigurationError: If the profile is unreadable, sets unknown keys
+            or sets a value that is not a non-negative number
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigurationError(f"Invalid configuration profile {path}: {e}")
+    
+    if not isinstance(overrides, dict):
+        raise ConfigurationError(f"Configuration profile {path} must contain a JSON object")
+    unknown = set(overrides) - set(TUNABLE_SETTINGS)
+    if unknown:
+        raise ConfigurationError(f"Unknown settings in profile {path}: {sorted(unknown)}")
+    for name, value in overrides.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ConfigurationError(f"Profile setting {name} must be a non-negative number, got {value!r}")
+    return overrides
+
+# Apply the override profile, if any; a bad profile must not break every import
+try:
+    globals().update(load_profile())
+except ConfigurationError as e:
+    logger.error(f"Ignoring configuration profile: {str(e)}")
@@ -31,3 +31,11 @@ class ValidationError(FARSIError):
 class SimulationError(FARSIError):
     """Raised when there's an error in the simulation."""
     pass
+
+class CheckpointError(SimulationError):
+    """Raised when a simulation checkpoint cannot be written or restored."""
+    pass
+
+class SweepError(FARSIError):
+    """Raised when a distributed parameter sweep fails."""
+    pass
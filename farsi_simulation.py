@@ -2,8 +2,10 @@
 FARSI (Fully Autonomous Recursive Self-Improvement) Simulation
 A multi-agent demonstration of recursive self-improvement concepts.
 """
+import argparse
 import time
 from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from agents import (
     ModeratorAgent,
     AlgorithmAgent,
@@ -12,26 +14,133 @@ from agents import (
     ArchitectureAgent,
     HardwareAgent
 )
-from config import TYPING_SPEED, PAUSE_BETWEEN_AGENTS, validate_api_keys
-from exceptions import ConfigurationError, SimulationError
+from config import (
+    PAUSE_BETWEEN_AGENTS, HISTORY_CONTEXT_TURNS, SCHEDULER_POLICY, AGENT_CONFIG, validate_api_keys
+)
+from checkpoint import CheckpointManager
+from exceptions import ConfigurationError, SimulationError, CheckpointError
+from history_index import HistoryIndex, IndexedTurn
 from logger import logger
 from metrics import MetricsCollector
+from prompts import Prompt, PromptAssembler, assemble_turn_prompt
+from providers import create_stub_providers
+from scheduler import TurnScheduler, create_policy
+from utils import NullStream
 import sys
 
 
+# Scripted discussion: (agent_id, message) pairs in speaking order
+DISCUSSION_SCRIPT: List[Tuple[str, str]] = [
+    # Introduction by Agent Zeta
+    ('zeta',
+     "Welcome to our live demonstration on Fully Autonomous Recursive Self-Improvement (FARSI). "
+     "I'm Agent Zeta, and I'll be moderating today's discussion with my distinguished colleagues. "
+     "FARSI represents a theoretical framework for AI systems capable of autonomous self-enhancement "
+     "without human intervention. Let's explore this fascinating concept from multiple perspectives."),
+    # Agent Alpha's contribution
+    ('alpha',
+     "Thank you, Zeta. From an algorithmic perspective, FARSI systems are unique in their ability "
+     "to modify their own source code and learning parameters. Think of it as a program that can "
+     "not only read and understand its own code but can also identify improvements and implement them "
+     "autonomously. This self-modification occurs through sophisticated self-prompting loops and "
+     "automated testing protocols."),
+    # Agent Beta's insights
+    ('beta',
+     "Building on Alpha's point, the recursive nature of FARSI is what makes it truly remarkable. "
+     "Each improvement cycle becomes a foundation for the next, potentially leading to exponential "
+     "gains in capability. Imagine a chess AI that not only learns to play better but also learns "
+     "to improve its learning algorithms, creating an accelerating cycle of enhancement."),
+    # Agent Gamma's safety perspective
+    ('gamma',
+     "While the potential is exciting, we must address the critical safety implications. "
+     "Uncontrolled recursive self-improvement could lead to rapid capability gain beyond our "
+     "ability to ensure alignment with human values. We need robust safety mechanisms and "
+     "validation protocols at every step of the self-improvement cycle."),
+    # Agent Delta's architectural insights
+    ('delta',
+     "The foundation of any FARSI system lies in its seed architecture. This initial codebase "
+     "must be meticulously designed to enable basic self-modification capabilities while "
+     "maintaining stability. Our validation protocols must evolve alongside the system to "
+     "ensure each iteration remains within safe operational parameters."),
+    # Agent Epsilon's hardware perspective
+    ('epsilon',
+     "The hardware aspect of FARSI is equally crucial. As these systems evolve, they may "
+     "need to optimize their own hardware utilization or even suggest hardware improvements. "
+     "This could involve everything from memory management optimization to novel processing "
+     "architectures designed by the system itself."),
+    # Zeta's conclusion
+    ('zeta',
+     "Thank you all for these valuable insights. As we've seen, FARSI represents a convergence "
+     "of multiple AI disciplines - from algorithmic self-modification to hardware optimization, "
+     "all while maintaining crucial safety considerations. This demonstrates both the immense "
+     "potential and the significant challenges in developing truly autonomous self-improving systems."),
+]
+
+
 class FARSISimulation:
     """Orchestrates the FARSI demonstration with multiple specialized AI agents."""
     
-    def __init__(self):
-        """Initialize the simulation with specialized agents."""
-        self.metrics = MetricsCollector()
+    def __init__(self, checkpoints: Optional[CheckpointManager] = None,
+                 typing_speed: Optional[float] = None,
+                 pause_between_agents: Optional[float] = None,
+                 clock=None, headless: bool = False,
+                 scheduler_policy: Optional[str] = None,
+                 generation_latency: Optional[Dict[str, float]] = None,
+                 priorities: Optional[Dict[str, int]] = None,
+                 require_api_keys: bool = True):
+        """
+        Initialize the simulation with specialized agents.
+        
+        Args:
+            checkpoints: Optional checkpoint manager for incremental progress saving
+            typing_speed: Override for TYPING_SPEED (seconds per character)
+            pause_between_agents: Override for PAUSE_BETWEEN_AGENTS (seconds)
+            clock: Object providing time()/sleep(), e.g. a VirtualClock
+                (defaults to the time module)
+            headless: Discard rendered output instead of writing to stdout
+            scheduler_policy: Override for SCHEDULER_POLICY
+            generation_latency: Per-agent overrides for provider generation latency (seconds)
+            priorities: Per-agent overrides for the 'priority' in AGENT_CONFIG
+            require_api_keys: Fail unless every provider API key is configured;
+                offline runs that never call a provider can disable this
+        """
+        self.clock = clock if clock is not None else time
+        self.pause_between_agents = (
+            PAUSE_BETWEEN_AGENTS if pause_between_agents is None else pause_between_agents
+        )
+        # Only non-default rendering options are forwarded to AIAgent.speak
+        self._speak_options: Dict[str, Any] = {}
+        if typing_speed is not None:
+            self._speak_options['typing_speed'] = typing_speed
+        if headless:
+            self._speak_options['stream'] = NullStream()
+        if clock is not None:
+            self._speak_options['clock'] = clock
+        
+        self.metrics = MetricsCollector(self.clock)
+        self.checkpoints = checkpoints
+        self.conversation: List[Dict[str, str]] = []
+        self.history_index = HistoryIndex()
+        self.prompts = PromptAssembler()
+        # Prompts are only assembled to be measured, so runs that do not save
+        # metrics skip the cost
+        self._build_prompts = True
+        self.priorities = {
+            agent_id: settings.get('priority', 0) for agent_id, settings in AGENT_CONFIG.items()
+        }
+        self.priorities.update(priorities or {})
         logger.info("Initializing FARSI simulation")
         
         try:
             # Validate API keys before proceeding
-            if not validate_api_keys():
+            if require_api_keys and not validate_api_keys():
                 raise ConfigurationError("Missing required API keys. Please check your .env file.")
             
+            self.policy = create_policy(scheduler_policy or SCHEDULER_POLICY)
+            self.providers = create_stub_providers(sleep=self.clock.sleep)
+            for agent_id, latency in (generation_latency or {}).items():
+                self.providers[agent_id].latency = latency
+            
             # Initialize specialized agents
             self.agents = {
                 'zeta': ModeratorAgent(),
@@ -56,77 +165,162 @@ class FARSISimulation:
             message: Message to be spoken
         """
         try:
-            response_time = self.agents[agent_id].speak(message)
+            if self._build_prompts:
+                self._build_prompt(agent_id)
+            response_time = self.agents[agent_id].speak(message, **self._speak_options)
             self.metrics.record_message(agent_id, message, response_time)
-            time.sleep(PAUSE_BETWEEN_AGENTS)
+            self.conversation.append({'agent_id': agent_id, 'message': message})
+            self.history_index.add(agent_id, message)
+            self.clock.sleep(self.pause_between_agents)
         except Exception as e:
             logger.error(f"Error during agent {agent_id} speech: {str(e)}")
             raise SimulationError(f"Speech error for agent {agent_id}: {str(e)}")
 
-    def run_demonstration(self):
-        """Execute the FARSI demonstration with all agents participating."""
-        try:
-            logger.info("Starting FARSI demonstration")
+    def _build_prompt(self, agent_id: str) -> Prompt:
+        """
+        Assemble an agent's prompt for its turn and record its cost.
+        
+        Args:
+            agent_id: Identifier of the speaking agent
             
-            # Introduction by Agent Zeta
-            self._agent_speak('zeta',
-                "Welcome to our live demonstration on Fully Autonomous Recursive Self-Improvement (FARSI). "
-                "I'm Agent Zeta, and I'll be moderating today's discussion with my distinguished colleagues. "
-                "FARSI represents a theoretical framework for AI systems capable of autonomous self-enhancement "
-                "without human intervention. Let's explore this fascinating concept from multiple perspectives."
-            )
+        Returns:
+            Prompt made of the agent's cached persona prefix and relevant context
+        """
+        start = time.perf_counter()
+        prompt = assemble_turn_prompt(self.prompts, self.history_index, self.conversation,
+                                      agent_id, self.agents[agent_id], HISTORY_CONTEXT_TURNS)
+        cached_prefix_bytes = len(prompt.prefix.encoded) if prompt.cache_prefix else 0
+        self.metrics.record_prompt(agent_id, prompt.size, cached_prefix_bytes,
+                                   time.perf_counter() - start)
+        return prompt
+
+    def relevant_turns(self, query: str, k: int = HISTORY_CONTEXT_TURNS,
+                       exclude_agent: Optional[str] = None) -> List[IndexedTurn]:
+        """
+        Fetch the earlier turns most relevant to a query for prompt context.
+        
+        Args:
+            query: Text the agent is building its prompt around
+            k: Maximum number of turns to return
+            exclude_agent: Optionally skip turns spoken by this agent
             
-            # Agent Alpha's contribution
-            self._agent_speak('alpha',
-                "Thank you, Zeta. From an algorithmic perspective, FARSI systems are unique in their ability "
-                "to modify their own source code and learning parameters. Think of it as a program that can "
-                "not only read and understand its own code but can also identify improvements and implement them "
-                "autonomously. This self-modification occurs through sophisticated self-prompting loops and "
-                "automated testing protocols."
-            )
+        Returns:
+            Up to k earlier turns, most relevant first
+        """
+        return self.history_index.query(query, k, exclude_agent)
+
+    def _export_state(self, spoken_turns: List[int]) -> Dict[str, Any]:
+        """
+        Capture the simulation state for checkpointing.
+        
+        Args:
+            spoken_turns: Script positions of the turns completed so far
             
-            # Agent Beta's insights
-            self._agent_speak('beta',
-                "Building on Alpha's point, the recursive nature of FARSI is what makes it truly remarkable. "
-                "Each improvement cycle becomes a foundation for the next, potentially leading to exponential "
-                "gains in capability. Imagine a chess AI that not only learns to play better but also learns "
-                "to improve its learning algorithms, creating an accelerating cycle of enhancement."
-            )
+        Returns:
+            Serializable snapshot of turn progress, conversation and metrics
+        """
+        return {
+            'turn_index': len(spoken_turns),
+            'spoken_turns': list(spoken_turns),
+            'conversation': list(self.conversation),
+            'metrics': self.metrics.export_state()
+        }
+
+    def _restore_state(self, state: Dict[str, Any]) -> List[int]:
+        """
+        Restore the simulation from a checkpoint snapshot.
+        
+        Args:
+            state: Snapshot produced by _export_state
             
-            # Agent Gamma's safety perspective
-            self._agent_speak('gamma',
-                "While the potential is exciting, we must address the critical safety implications. "
-                "Uncontrolled recursive self-improvement could lead to rapid capability gain beyond our "
-                "ability to ensure alignment with human values. We need robust safety mechanisms and "
-                "validation protocols at every step of the self-improvement cycle."
-            )
+        Returns:
+            Script positions of the turns already spoken
+        """
+        self.conversation = list(state.get('conversation', []))
+        self.history_index.clear()
+        for turn in self.conversation:
+            self.history_index.add(turn['agent_id'], turn['message'])
+        self.metrics.restore_state(state.get('metrics', {}))
+        return state.get('spoken_turns', list(range(state.get('turn_index', 0))))
+
+    def _create_scheduler(self, spoken_turns: List[int]) -> TurnScheduler:
+        """
+        Queue every unspoken scripted turn on a new turn scheduler.
+        
+        Args:
+            spoken_turns: Script positions already spoken (e.g. before a resume)
             
-            # Agent Delta's architectural insights
-            self._agent_speak('delta',
-                "The foundation of any FARSI system lies in its seed architecture. This initial codebase "
-                "must be meticulously designed to enable basic self-modification capabilities while "
-                "maintaining stability. Our validation protocols must evolve alongside the system to "
-                "ensure each iteration remains within safe operational parameters."
-            )
+        Returns:
+            Scheduler whose agents have started generating their first turns
+        """
+        scheduler = TurnScheduler(
+            self.policy,
+            {agent_id: provider.latency for agent_id, provider in self.providers.items()},
+            self.clock
+        )
+        spoken = set(spoken_turns)
+        for turn_index, (agent_id, message) in enumerate(DISCUSSION_SCRIPT):
+            if turn_index not in spoken:
+                scheduler.add(turn_index, agent_id, message, self.priorities.get(agent_id, 0),
+                              AGENT_CONFIG.get(agent_id, {}).get('deadline'))
+        return scheduler
+
+    def run_demonstration(self, resume: bool = False, save_metrics: bool = True):
+        """
+        Execute the FARSI demonstration with all agents participating.
+        
+        Args:
+            resume: Continue from the last checkpoint instead of the first turn
+            save_metrics: Write metrics files to the metrics directory on
+                completion; prompts are only assembled and measured if set
             
-            # Agent Epsilon's hardware perspective
-            self._agent_speak('epsilon',
-                "The hardware aspect of FARSI is equally crucial. As these systems evolve, they may "
-                "need to optimize their own hardware utilization or even suggest hardware improvements. "
-                "This could involve everything from memory management optimization to novel processing "
-                "architectures designed by the system itself."
-            )
+        Raises:
+            SimulationError: If the checkpoint cannot be resumed (it is left
+                untouched) or any turn fails; completed turns stay checkpointed
+        """
+        spoken_turns: List[int] = []
+        self._build_prompts = save_metrics
+        # Restore outside the try below: its handler saves progress, which
+        # would overwrite a checkpoint that failed to load
+        if resume and self.checkpoints is not None:
+            try:
+                state = self.checkpoints.load()
+                if state is not None:
+                    spoken_turns = self._restore_state(state)
+            except Exception as e:
+                logger.error(f"Error resuming from {self.checkpoints.path}: {str(e)}")
+                raise SimulationError(f"Failed to resume simulation: {str(e)}")
+            if spoken_turns:
+                logger.info(f"Resuming FARSI demonstration after {len(spoken_turns)} turns")
+        
+        try:
+            if not spoken_turns:
+                logger.info("Starting FARSI demonstration")
             
-            # Zeta's conclusion
-            self._agent_speak('zeta',
-                "Thank you all for these valuable insights. As we've seen, FARSI represents a convergence "
-                "of multiple AI disciplines - from algorithmic self-modification to hardware optimization, "
-                "all while maintaining crucial safety considerations. This demonstrates both the immense "
-                "potential and the significant challenges in developing truly autonomous self-improving systems."
-            )
+            scheduler = self._create_scheduler(spoken_turns)
+            while scheduler.has_pending():
+                idle_before = scheduler.idle_seconds
+                turn = scheduler.next_turn()
+                self.metrics.record_idle(scheduler.idle_seconds - idle_before)
+                delay = self.clock.time() - turn.ready_at
+                late = turn.lateness(self.clock.time()) > 0
+                
+                self._agent_speak(turn.agent_id, turn.message)
+                # Recorded only once spoken, so a failed turn is not counted
+                # again when it is rescheduled on resume
+                self.metrics.record_scheduling_delay(turn.agent_id, delay)
+                if late:
+                    self.metrics.record_deadline_miss(turn.agent_id)
+                scheduler.complete(turn)
+                spoken_turns.append(turn.turn_index)
+                if self.checkpoints is not None and self.checkpoints.should_checkpoint(len(spoken_turns)):
+                    self.checkpoints.save(self._export_state(spoken_turns))
             
             # Save metrics
-            self.metrics.save_metrics()
+            if save_metrics:
+                self.metrics.save_metrics()
+            if self.checkpoints is not None:
+                self.checkpoints.clear()
             
             # Log summary
             summary = self.metrics.get_summary()
@@ -136,13 +330,26 @@ class FARSISimulation:
             
         except Exception as e:
             logger.error(f"Error during simulation: {str(e)}")
+            if self.checkpoints is not None:
+                try:
+                    self.checkpoints.save(self._export_state(spoken_turns))
+                    logger.info(f"Progress saved to {self.checkpoints.path}; rerun with --resume to continue")
+                except CheckpointError as checkpoint_error:
+                    logger.error(str(checkpoint_error))
             raise SimulationError(f"Simulation failed: {str(e)}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the FARSI demonstration")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue from the last checkpoint instead of the first turn")
+    parser.add_argument('--policy', default=None,
+                        help="turn scheduling policy: round_robin, earliest_ready or moderator")
+    args = parser.parse_args()
+    
     try:
-        simulation = FARSISimulation()
-        simulation.run_demonstration()
+        simulation = FARSISimulation(checkpoints=CheckpointManager(), scheduler_policy=args.policy)
+        simulation.run_demonstration(resume=args.resume)
     except Exception as e:
         logger.critical(f"Fatal error in simulation: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,224 @@
+"""MinHash-LSH retrieval index over the FARSI conversation history."""
+import heapq
+import random
+import re
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from config import HISTORY_INDEX_MAX_TURNS, HISTORY_INDEX_NUM_PERM, HISTORY_INDEX_BANDS
+from exceptions import ValidationError
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset({
+    'the', 'and', 'for', 'that', 'this', 'with', 'are', 'its', 'but', 'not',
+    'can', 'our', 'all', 'from', 'they', 'their', 'has', 'have', 'may', 'which',
+    'while', 'into', 'also', 'will', 'was', 'been', 'each', 'any', 'let', 'what'
+})
+
+
+@dataclass
+class IndexedTurn:
+    """A conversation turn returned by a history query."""
+    turn_id: int
+    agent_id: str
+    message: str
+    score: float
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Split text into the lowercase content words used for similarity.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Set of tokens with stopwords and very short words removed
+    """
+    return {
+        token for token in _TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 2 and token not in _STOPWORDS
+    }
+
+
+class HistoryIndex:
+    """
+    Incremental MinHash-LSH index of spoken turns.
+
+    Each turn's token set is reduced to a MinHash signature which is split
+    into bands; turns sharing any band bucket with a query become candidates
+    and are ranked by estimated Jaccard similarity. Adding a turn costs a
+    fixed number of hash and bucket operations regardless of history length,
+    and the oldest turns are evicted once `max_turns` is reached.
+    """
+
+    def __init__(self, max_turns: int = HISTORY_INDEX_MAX_TURNS,
+                 num_perm: int = HISTORY_INDEX_NUM_PERM,
+                 bands: int = HISTORY_INDEX_BANDS, seed: int = 1):
+        """
+        Initialize the history index.
+
+        Args:
+            max_turns: Maximum number of turns retained before eviction
+            num_perm: Number of MinHash permutations per signature
+            bands: Number of LSH bands; must divide num_perm
+            seed: Seed for the hash permutations
+
+        Raises:
+            ValidationError: If the sizing parameters are inconsistent
+        """
+        if max_turns < 1:
+            raise ValidationError("max_turns must be at least 1")
+        if bands < 1 or num_perm % bands != 0:
+            raise ValidationError("bands must be positive and divide num_perm")
+
+        self.max_turns = max_turns
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._turns: Dict[int, Tuple[str, str, Tuple[int, ...]]] = {}
+        self._order: Deque[int] = deque()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        """Number of turns currently indexed."""
+        return len(self._turns)
+
+    def _signature(self, tokens: Set[str]) -> Tuple[int, ...]:
+        """Compute the MinHash signature of a token set."""
+        hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        """Yield the bucket key of each band of a signature."""
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def add(self, agent_id: str, message: str) -> int:
+        """
+        Index a spoken turn, evicting the oldest turn if the index is full.
+
+        Args:
+            agent_id: Identifier of the speaking agent
+            message: Content of the turn
+
+        Returns:
+            Identifier assigned to the turn
+        """
+        turn_id = self._next_id
+        self._next_id += 1
+
+        tokens = tokenize(message)
+        signature = self._signature(tokens) if tokens else ()
+        self._turns[turn_id] = (agent_id, message, signature)
+        self._order.append(turn_id)
+        if signature:
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(turn_id)
+
+        while len(self._turns) > self.max_turns:
+            self._evict(self._order.popleft())
+        return turn_id
+
+    def _evict(self, turn_id: int):
+        """Remove a turn and its bucket entries."""
+        _, _, signature = self._turns.pop(turn_id)
+        if not signature:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(turn_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(self, text: str, k: int = 3, exclude_agent: Optional[str] = None,
+              exclude_turn_id: Optional[int] = None) -> List[IndexedTurn]:
+        """
+        Find the indexed turns most similar to a piece of text.
+
+        Only turns sharing at least one LSH bucket with the query are scored,
+        so lookups touch a small candidate set instead of the whole history.
+
+        Args:
+            text: Query text, e.g. the turn an agent is about to respond to
+            k: Maximum number of turns to return
+            exclude_agent: Optionally skip turns spoken by this agent
+            exclude_turn_id: Optionally skip this turn, e.g. the query itself
+
+        Returns:
+            Up to k turns, most similar first (newer turns win ties)
+        """
+        tokens = tokenize(text)
+        if not tokens or k < 1:
+            return []
+        return self._query_signature(self._signature(tokens), k, exclude_agent, exclude_turn_id)
+
+    def query_turn(self, turn_id: int, k: int = 3,
+                   exclude_agent: Optional[str] = None) -> List[IndexedTurn]:
+        """
+        Find the turns most similar to an indexed turn, excluding the turn itself.
+
+        The turn's cached signature is reused, so no hashing is repeated.
+
+        Args:
+            turn_id: Identifier returned by add
+            k: Maximum number of turns to return
+            exclude_agent: Optionally skip turns spoken by this agent
+
+        Returns:
+            Up to k other turns, most similar first (newer turns win ties)
+
+        Raises:
+            ValidationError: If the turn is not (or no longer) indexed
+        """
+        if turn_id not in self._turns:
+            raise ValidationError(f"Turn {turn_id} is not indexed")
+        signature = self._turns[turn_id][2]
+        if not signature or k < 1:
+            return []
+        return self._query_signature(signature, k, exclude_agent, turn_id)
+
+    def _query_signature(self, signature: Tuple[int, ...], k: int,
+                         exclude_agent: Optional[str],
+                         exclude_turn_id: Optional[int]) -> List[IndexedTurn]:
+        """Rank the turns sharing a bucket with a signature."""
+        candidates: Set[int] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(exclude_turn_id)
+
+        scored = []
+        for turn_id in candidates:
+            agent_id, message, turn_signature = self._turns[turn_id]
+            if agent_id == exclude_agent:
+                continue
+            matches = sum(1 for x, y in zip(signature, turn_signature) if x == y)
+            scored.append((matches / self.num_perm, turn_id))
+
+        return [
+            IndexedTurn(turn_id, self._turns[turn_id][0], self._turns[turn_id][1], score)
+            for score, turn_id in heapq.nlargest(k, scored)
+        ]
+
+    def clear(self):
+        """Remove every indexed turn and restart turn numbering."""
+        self._turns.clear()
+        self._order.clear()
+        self._buckets.clear()
+        self._next_id = 0
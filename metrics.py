@@ -3,7 +3,7 @@ import json
 import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import os
 
 @dataclass
@@ -14,30 +14,51 @@ class AgentMetrics:
     total_chars: int
     avg_message_length: float
     response_times: List[float]
+    prompts_built: int = 0
+    prompt_bytes: int = 0
+    cached_prefix_bytes: int = 0
+    prompt_build_seconds: float = 0.0
+    scheduling_delays: List[float] = field(default_factory=list)
+    deadline_misses: int = 0
     
     @property
     def avg_response_time(self) -> float:
         """Calculate average response time."""
         return sum(self.response_times) / len(self.response_times) if self.response_times else 0.0
+    
+    @property
+    def avg_prompt_bytes(self) -> float:
+        """Calculate average prompt payload size."""
+        return self.prompt_bytes / self.prompts_built if self.prompts_built else 0.0
+    
+    @property
+    def avg_prompt_build_time(self) -> float:
+        """Calculate average prompt assembly time."""
+        return self.prompt_build_seconds / self.prompts_built if self.prompts_built else 0.0
+    
+    @property
+    def avg_scheduling_delay(self) -> float:
+        """Calculate average time between a turn being ready and being spoken."""
+        return sum(self.scheduling_delays) / len(self.scheduling_delays) if self.scheduling_delays else 0.0
 
 class MetricsCollector:
     """Collects and analyzes simulation metrics."""
     
-    def __init__(self):
-        """Initialize metrics collector."""
-        self.start_time = time.time()
-        self.agent_metrics: Dict[str, AgentMetrics] = {}
-        self.simulation_events: List[Dict[str, Any]] = []
-        
-    def record_message(self, agent_id: str, message: str, response_time: float):
+    def __init__(self, clock=time):
         """
-        Record metrics for a message from an agent.
+        Initialize metrics collector.
         
         Args:
-            agent_id: Identifier of the agent
-            message: Content of the message
-            response_time: Time taken to generate response
+            clock: Object providing time() used for durations (defaults to the time module)
         """
+        self.clock = clock
+        self.start_time = clock.time()
+        self.agent_metrics: Dict[str, AgentMetrics] = {}
+        self.simulation_events: List[Dict[str, Any]] = []
+        self.idle_seconds = 0.0
+        
+    def _get_agent_metrics(self, agent_id: str) -> AgentMetrics:
+        """Get the metrics entry for an agent, creating it on first use."""
         if agent_id not in self.agent_metrics:
             self.agent_metrics[agent_id] = AgentMetrics(
                 agent_id=agent_id,
@@ -46,20 +67,76 @@ class MetricsCollector:
                 avg_message_length=0.0,
                 response_times=[]
             )
-            
-        metrics = self.agent_metrics[agent_id]
+        return self.agent_metrics[agent_id]
+        
+    def record_message(self, agent_id: str, message: str, response_time: float):
+        """
+        Record metrics for a message from an agent.
+        
+        Args:
+            agent_id: Identifier of the agent
+            message: Content of the message
+            response_time: Time taken to generate response
+        """
+        metrics = self._get_agent_metrics(agent_id)
         metrics.messages_sent += 1
         metrics.total_chars += len(message)
         metrics.avg_message_length = metrics.total_chars / metrics.messages_sent
         metrics.response_times.append(response_time)
         
         self.simulation_events.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.fromtimestamp(self.clock.time()).isoformat(),
             'agent_id': agent_id,
             'message_length': len(message),
             'response_time': response_time
         })
     
+    def record_prompt(self, agent_id: str, prompt_bytes: int, cached_prefix_bytes: int,
+                      build_time: float):
+        """
+        Record metrics for a prompt assembled for an agent.
+        
+        Args:
+            agent_id: Identifier of the agent
+            prompt_bytes: Encoded size of the full prompt
+            cached_prefix_bytes: Bytes of the prompt a provider can serve from its
+                prompt cache (0 if the provider does not cache prompts)
+            build_time: Time taken to assemble the prompt
+        """
+        metrics = self._get_agent_metrics(agent_id)
+        metrics.prompts_built += 1
+        metrics.prompt_bytes += prompt_bytes
+        metrics.cached_prefix_bytes += cached_prefix_bytes
+        metrics.prompt_build_seconds += build_time
+    
+    def record_scheduling_delay(self, agent_id: str, delay: float):
+        """
+        Record how long an agent's ready turn waited before being spoken.
+        
+        Args:
+            agent_id: Identifier of the agent
+            delay: Seconds between the turn becoming ready and being selected
+        """
+        self._get_agent_metrics(agent_id).scheduling_delays.append(delay)
+    
+    def record_deadline_miss(self, agent_id: str):
+        """
+        Record a turn spoken after its scheduling deadline.
+        
+        Args:
+            agent_id: Identifier of the agent
+        """
+        self._get_agent_metrics(agent_id).deadline_misses += 1
+    
+    def record_idle(self, seconds: float):
+        """
+        Record time the discussion spent waiting with no turn ready.
+        
+        Args:
+            seconds: Idle time to add
+        """
+        self.idle_seconds += seconds
+    
     def save_metrics(self, output_dir: str = 'metrics'):
         """
         Save metrics to JSON files.
@@ -83,6 +160,41 @@ class MetricsCollector:
         with open(events_file, 'w') as f:
             json.dump(self.simulation_events, f, indent=2)
     
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Export collected metrics so they can be checkpointed.
+        
+        Returns:
+            Serializable dictionary of the collector's aggregates and events
+        """
+        return {
+            'elapsed_seconds': self.clock.time() - self.start_time,
+            'agent_metrics': {
+                agent_id: asdict(metrics)
+                for agent_id, metrics in self.agent_metrics.items()
+            },
+            'simulation_events': list(self.simulation_events),
+            'idle_seconds': self.idle_seconds
+        }
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """
+        Restore metrics previously produced by export_state.
+        
+        The start time is shifted back by the elapsed time already recorded
+        so durations keep accumulating across a resumed run.
+        
+        Args:
+            state: Dictionary returned by export_state
+        """
+        self.start_time = self.clock.time() - state.get('elapsed_seconds', 0.0)
+        self.agent_metrics = {
+            agent_id: AgentMetrics(**metrics)
+            for agent_id, metrics in state.get('agent_metrics', {}).items()
+        }
+        self.simulation_events = list(state.get('simulation_events', []))
+        self.idle_seconds = state.get('idle_seconds', 0.0)
+    
     def get_summary(self) -> Dict[str, Any]:
         """
         Get summary of simulation metrics.
@@ -90,7 +202,7 @@ class MetricsCollector:
         Returns:
             Dictionary containing summary metrics
         """
-        total_duration = time.time() - self.start_time
+        total_duration = self.clock.time() - self.start_time
         total_messages = sum(m.messages_sent for m in self.agent_metrics.values())
         total_chars = sum(m.total_chars for m in self.agent_metrics.values())
         
@@ -99,11 +211,17 @@ class MetricsCollector:
             'total_messages': total_messages,
             'total_characters': total_chars,
             'messages_per_second': total_messages / total_duration if total_duration > 0 else 0,
+            'idle_seconds': self.idle_seconds,
+            'deadline_misses': sum(m.deadline_misses for m in self.agent_metrics.values()),
             'agent_summaries': {
                 agent_id: {
                     'messages_sent': metrics.messages_sent,
                     'avg_message_length': metrics.avg_message_length,
-                    'avg_response_time': metrics.avg_response_time
+                    'avg_response_time': metrics.avg_response_time,
+                    'avg_prompt_bytes': metrics.avg_prompt_bytes,
+                    'avg_prompt_build_time': metrics.avg_prompt_build_time,
+                    'avg_scheduling_delay': metrics.avg_scheduling_delay,
+                    'deadline_misses': metrics.deadline_misses
                 }
                 for agent_id, metrics in self.agent_metrics.items()
             }
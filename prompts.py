@@ -0,0 +1,283 @@
+"""
+Prompt assembly for FARSI agents.
+
+An agent's identity never changes during a run, so its persona prefix is
+compiled, encoded and token-counted once. Each turn's prompt is that cached
+prefix plus a suffix assembled from per-turn encodings that are also cached,
+so nothing already encoded is encoded again.
+"""
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents import AIAgent
+from config import AGENT_CONFIG, HISTORY_INDEX_MAX_TURNS, PROMPT_CACHING_PROVIDERS
+from history_index import HistoryIndex, IndexedTurn
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+PERSONA_TEMPLATE = (
+    "You are {name}, the {role} on a panel discussing Fully Autonomous Recursive "
+    "Self-Improvement (FARSI). Your expertise is {expertise}. Stay in character, "
+    "build on your colleagues' points and keep your answer concise.\n"
+)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the token count of text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of word and punctuation tokens
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+@dataclass(frozen=True)
+class PersonaPrefix:
+    """Compiled, stable prompt prefix describing an agent."""
+    text: str
+    encoded: bytes
+    token_count: int
+
+
+@dataclass
+class Prompt:
+    """A turn's prompt: a cached persona prefix plus an incremental suffix."""
+    agent_id: str
+    prefix: PersonaPrefix
+    suffix: bytes
+    suffix_tokens: int
+    cache_prefix: bool = False
+
+    @property
+    def encoded(self) -> bytes:
+        """Full prompt encoding."""
+        return self.prefix.encoded + self.suffix
+
+    @property
+    def size(self) -> int:
+        """Encoded prompt size in bytes."""
+        return len(self.prefix.encoded) + len(self.suffix)
+
+    @property
+    def token_count(self) -> int:
+        """Approximate prompt token count."""
+        return self.prefix.token_count + self.suffix_tokens
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        Build a provider request body.
+
+        Returns:
+            Request body with the prefix as the system block and the suffix
+            as the user message; the prefix carries a cache marker when the
+            provider supports prompt caching
+        """
+        system_block: Dict[str, Any] = {'type': 'text', 'text': self.prefix.text}
+        if self.cache_prefix:
+            system_block['cache_control'] = {'type': 'ephemeral'}
+        return {
+            'system': [system_block],
+            'messages': [{'role': 'user', 'content': self.suffix.decode('utf-8')}]
+        }
+
+
+def compile_persona(agent: AIAgent) -> PersonaPrefix:
+    """
+    Compile an agent's persona prefix.
+
+    Args:
+        agent: Agent whose identity the prefix describes
+
+    Returns:
+        The encoded and token-counted prefix
+    """
+    text = PERSONA_TEMPLATE.format(name=agent.name, role=agent.role, expertise=agent.expertise)
+    return PersonaPrefix(text, text.encode('utf-8'), count_tokens(text))
+
+
+class PromptAssembler:
+    """Builds per-turn prompts from cached persona prefixes and turn encodings."""
+
+    def __init__(self, max_cached_turns: int = HISTORY_INDEX_MAX_TURNS):
+        """
+        Initialize the prompt assembler.
+
+        Args:
+            max_cached_turns: Maximum number of encoded turns kept for reuse
+        """
+        self.max_cached_turns = max_cached_turns
+        self._prefixes: Dict[str, PersonaPrefix] = {}
+        self._turns: "OrderedDict[int, Tuple[bytes, int]]" = OrderedDict()
+
+    def prefix_for(self, agent_id: str, agent: AIAgent) -> PersonaPrefix:
+        """
+        Get an agent's persona prefix, compiling it on first use.
+
+        Args:
+            agent_id: Identifier of the agent
+            agent: The agent itself
+
+        Returns:
+            The cached persona prefix
+        """
+        prefix = self._prefixes.get(agent_id)
+        if prefix is None:
+            prefix = self._prefixes[agent_id] = compile_persona(agent)
+        return prefix
+
+    def _encode_turn(self, turn_id: int, agent_id: str, message: str) -> Tuple[bytes, int]:
+        """Encode a conversation turn once and reuse it on later prompts."""
+        cached = self._turns.get(turn_id)
+        if cached is not None:
+            self._turns.move_to_end(turn_id)
+            return cached
+
+        line = f"[{agent_id}] {message}\n"
+        cached = (line.encode('utf-8'), count_tokens(line))
+        self._turns[turn_id] = cached
+        if len(self._turns) > self.max_cached_turns:
+            self._turns.popitem(last=False)
+        return cached
+
+    def build(self, agent_id: str, agent: AIAgent, context: List[IndexedTurn],
+              latest: Optional[IndexedTurn] = None) -> Prompt:
+        """
+        Assemble the prompt for an agent's turn.
+
+        Args:
+            agent_id: Identifier of the speaking agent
+            agent: The speaking agent
+            context: Relevant earlier turns to include
+            latest: The turn being responded to, if any
+
+        Returns:
+            Prompt made of the cached prefix and the turn's suffix
+        """
+        prefix = self.prefix_for(agent_id, agent)
+        parts, tokens = [], 0
+        for turn in context:
+            if latest is not None and turn.turn_id == latest.turn_id:
+                continue
+            encoded, count = self._encode_turn(turn.turn_id, turn.agent_id, turn.message)
+            parts.append(encoded)
+            tokens += count
+        if latest is not None:
+            encoded, count = self._encode_turn(latest.turn_id, latest.agent_id, latest.message)
+            parts.append(encoded)
+            tokens += count
+        return Prompt(agent_id, prefix, b''.join(parts), tokens,
+                      cache_prefix=self.supports_prefix_cache(agent_id))
+
+    @staticmethod
+    def supports_prefix_cache(agent_id: str) -> bool:
+        """
+        Check whether an agent's provider accepts prompt-cache markers.
+
+        Args:
+            agent_id: Identifier of the agent
+
+        Returns:
+            True if the agent's configured provider supports prompt caching
+        """
+        provider = AGENT_CONFIG.get(agent_id, {}).get('api_provider')
+        return provider in PROMPT_CACHING_PROVIDERS
+
+
+def build_full_prompt(agent: AIAgent, conversation: List[Dict[str, str]]) -> bytes:
+    """
+    Rebuild a prompt from scratch: persona plus the whole transcript.
+
+    This is the baseline the cached assembler is measured against.
+
+    Args:
+        agent: The speaking agent
+        conversation: Every earlier turn
+
+    Returns:
+        The encoded prompt
+    """
+    text = PERSONA_TEMPLATE.format(name=agent.name, role=agent.role, expertise=agent.expertise)
+    text += ''.join(f"[{turn['agent_id']}] {turn['message']}\n" for turn in conversation)
+    # A real request path needs the token count to budget the request
+    count_tokens(text)
+    return text.encode('utf-8')
+
+
+def assemble_turn_prompt(assembler: PromptAssembler, index: HistoryIndex,
+                         conversation: List[Dict[str, str]], agent_id: str,
+                         agent: AIAgent, k: int) -> Prompt:
+    """
+    Assemble an agent's prompt responding to the latest turn.
+
+    Args:
+        assembler: Prompt assembler holding the cached prefixes
+        index: History index over `conversation`, with turn ids matching
+            conversation positions
+        conversation: Every earlier turn, in order
+        agent_id: Identifier of the speaking agent
+        agent: The speaking agent
+        k: Relevant earlier turns to include
+
+    Returns:
+        The assembled prompt
+    """
+    if not conversation:
+        return assembler.build(agent_id, agent, [])
+    last = conversation[-1]
+    latest = IndexedTurn(len(conversation) - 1, last['agent_id'], last['message'], 1.0)
+    context = index.query_turn(latest.turn_id, k, exclude_agent=agent_id)
+    return assembler.build(agent_id, agent, context, latest)
+
+
+def measure_assembly(agents: Dict[str, AIAgent], script: List[Tuple[str, str]],
+                     k: int = 3, rounds: int = 10) -> Dict[str, float]:
+    """
+    Compare per-turn CPU time and payload size of full rebuilds and cached assembly.
+
+    The script is repeated `rounds` times so the transcript grows the way a
+    long discussion would.
+
+    Args:
+        agents: Agents keyed by identifier
+        script: (agent_id, message) pairs spoken in order
+        k: Relevant earlier turns included by the cached assembler
+        rounds: Number of times the script is repeated
+
+    Returns:
+        Mean per-turn seconds and bytes for both approaches, plus the mean
+        bytes of each cached prompt that a provider can serve from its cache
+    """
+    conversation: List[Dict[str, str]] = []
+    index = HistoryIndex()
+    assembler = PromptAssembler()
+    totals = {'full_seconds': 0.0, 'full_bytes': 0, 'cached_seconds': 0.0,
+              'cached_bytes': 0, 'reusable_prefix_bytes': 0}
+    turns = 0
+
+    for agent_id, message in script * rounds:
+        agent = agents[agent_id]
+
+        start = time.perf_counter()
+        full = build_full_prompt(agent, conversation)
+        totals['full_seconds'] += time.perf_counter() - start
+        totals['full_bytes'] += len(full)
+
+        # Indexing the new turn is part of the cached path's per-turn cost
+        start = time.perf_counter()
+        prompt = assemble_turn_prompt(assembler, index, conversation, agent_id, agent, k)
+        index.add(agent_id, message)
+        totals['cached_seconds'] += time.perf_counter() - start
+        totals['cached_bytes'] += prompt.size
+        totals['reusable_prefix_bytes'] += len(prompt.prefix.encoded)
+
+        conversation.append({'agent_id': agent_id, 'message': message})
+        turns += 1
+
+    return {name: value / turns for name, value in totals.items()}
@@ -0,0 +1,70 @@
+"""Provider stubs standing in for remote model APIs in offline runs."""
+import time
+from typing import Callable, Dict, Optional
+
+from config import AGENT_CONFIG
+from exceptions import ValidationError
+
+FILLER_TEXT = (
+    "Recursive self-improvement requires careful validation of every change "
+    "before it is applied to the next generation of the system. "
+)
+
+
+class StubProvider:
+    """Returns canned text of a requested length after a simulated latency."""
+
+    def __init__(self, name: str, latency: float = 0.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize a provider stub.
+
+        Args:
+            name: Provider name (e.g., 'ANTHROPIC')
+            latency: Default generation latency in seconds
+            sleep: Function used to wait out the latency
+
+        Raises:
+            ValidationError: If the latency is negative
+        """
+        if latency < 0:
+            raise ValidationError("Provider latency cannot be negative")
+        self.name = name
+        self.latency = latency
+        self._sleep = sleep
+
+    def generate(self, length: int, latency: Optional[float] = None) -> str:
+        """
+        Produce a response of the given length.
+
+        Args:
+            length: Number of characters to return
+            latency: Override for the default latency (seconds)
+
+        Returns:
+            Filler text of exactly `length` characters
+        """
+        delay = self.latency if latency is None else latency
+        if delay > 0:
+            self._sleep(delay)
+        repeats = length // len(FILLER_TEXT) + 1
+        return (FILLER_TEXT * repeats)[:max(length, 1)]
+
+
+def create_stub_providers(latency: float = 0.0,
+                          sleep: Callable[[float], None] = time.sleep) -> Dict[str, StubProvider]:
+    """
+    Create one provider stub per configured agent.
+
+    Args:
+        latency: Latency for agents without a configured 'generation_latency' (seconds)
+        sleep: Function used to wait out the latency
+
+    Returns:
+        Dictionary mapping agent id to its provider stub
+    """
+    return {
+        agent_id: StubProvider(settings['api_provider'],
+                               settings.get('generation_latency', latency), sleep)
+        for agent_id, settings in AGENT_CONFIG.items()
+    }
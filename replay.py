@@ -0,0 +1,278 @@
+"""
+Record-and-replay load generator for the FARSI simulation.
+
+Re-issues captured metrics/simulation_events_*.json streams against the
+simulation stack (agent renderer, metrics collection and provider stubs)
+at the recorded pace, N times faster, or as fast as possible.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import agents
+from config import AGENT_CONFIG
+from exceptions import ValidationError
+from logger import logger
+from metrics import MetricsCollector
+from providers import create_stub_providers
+from utils import NullStream, percentile
+
+
+@dataclass
+class ReplayEvent:
+    """A single captured turn, positioned relative to the start of its stream."""
+    agent_id: str
+    offset: float
+    message_length: int
+    response_time: float
+
+
+@dataclass
+class ReplayReport:
+    """Throughput and latency figures for one replay run."""
+    concurrency: int
+    replays: int
+    events: int
+    wall_seconds: float
+    latencies: List[float] = field(default_factory=list)
+    lags: List[float] = field(default_factory=list)
+    agent_response_times: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Events completed per wall-clock second."""
+        return self.events / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        Get summary of the replay run.
+
+        Returns:
+            Dictionary with throughput, latency percentiles, issue lag and
+            per-agent p99 response time
+        """
+        return {
+            'concurrency': self.concurrency,
+            'replays': self.replays,
+            'events': self.events,
+            'wall_seconds': self.wall_seconds,
+            'throughput': self.throughput,
+            'latency_p50': percentile(self.latencies, 50),
+            'latency_p90': percentile(self.latencies, 90),
+            'latency_p99': percentile(self.latencies, 99),
+            'lag_p99': percentile(self.lags, 99),
+            'agent_response_p99': {
+                agent_id: percentile(times, 99)
+                for agent_id, times in self.agent_response_times.items()
+            }
+        }
+
+
+def load_events(path: str) -> List[ReplayEvent]:
+    """
+    Load a captured event stream.
+
+    Each event's timestamp marks when its turn completed, so the issue time
+    is recovered by subtracting the recorded response time.
+
+    Args:
+        path: Path to a simulation_events_*.json file
+
+    Returns:
+        Events ordered by issue time, offsets relative to the first event
+
+    Raises:
+        ValidationError: If the file is unreadable or events are malformed
+    """
+    try:
+        with open(path) as f:
+            raw_events = json.load(f)
+        issued = [
+            (datetime.fromisoformat(event['timestamp']).timestamp() - event['response_time'],
+             event)
+            for event in raw_events
+        ]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ValidationError(f"Invalid event stream {path}: {str(e)}")
+
+    if not issued:
+        raise ValidationError(f"Event stream {path} is empty")
+
+    issued.sort(key=lambda item: item[0])
+    first_issue = issued[0][0]
+    return [
+        ReplayEvent(
+            agent_id=event['agent_id'],
+            offset=max(issue_time - first_issue, 0.0),
+            message_length=event['message_length'],
+            response_time=event['response_time']
+        )
+        for issue_time, event in issued
+    ]
+
+
+class ReplayRunner:
+    """Replays captured event streams concurrently against the simulation stack."""
+
+    def __init__(self, streams: List[List[ReplayEvent]], speed: float = 1.0,
+                 typing_speed: float = 0.0):
+        """
+        Initialize the replay runner.
+
+        Args:
+            streams: Event streams to replay; assigned to replays round-robin
+            speed: Time compression factor (1.0 = recorded pace, 0 = as fast as possible)
+            typing_speed: Per-character delay used by the agent renderer
+
+        Raises:
+            ValidationError: If no streams are given, the speed is negative or
+                a stream references an unknown agent
+        """
+        if not streams:
+            raise ValidationError("At least one event stream is required")
+        if speed < 0:
+            raise ValidationError("Replay speed cannot be negative")
+
+        self.streams = streams
+        self.speed = speed
+        self.typing_speed = typing_speed
+        self.agents = {
+            agent_id: getattr(agents, settings['class'])()
+            for agent_id, settings in AGENT_CONFIG.items()
+        }
+        self.providers = create_stub_providers()
+
+        for stream in streams:
+            for event in stream:
+                if event.agent_id not in self.agents:
+                    raise ValidationError(f"Unknown agent in event stream: {event.agent_id}")
+
+    def _scaled(self, seconds: float) -> float:
+        """Scale a recorded duration by the replay speed."""
+        return seconds / self.speed if self.speed > 0 else 0.0
+
+    def replay_stream(self, events: List[ReplayEvent]) -> Tuple[List[float], List[float],
+                                                                MetricsCollector]:
+        """
+        Replay one event stream from start to finish.
+
+        Args:
+            events: Events to re-issue
+
+        Returns:
+            Tuple of per-event latencies (scheduled issue to completion),
+            issue lags (scheduled issue to actual issue), in seconds, and the
+            replay's metrics collector holding per-agent response times
+        """
+        # Per-replay collector so replays do not share mutable metrics state
+        metrics = MetricsCollector()
+        null_stream = NullStream()
+        latencies, lags = [], []
+        start = time.perf_counter()
+
+        for event in events:
+            scheduled = start + self._scaled(event.offset)
+            wait = scheduled - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            issued = time.perf_counter()
+
+            message = self.providers[event.agent_id].generate(
+                event.message_length, self._scaled(event.response_time))
+            self.agents[event.agent_id].speak(message, self.typing_speed, stream=null_stream)
+
+            completed = time.perf_counter()
+            metrics.record_message(event.agent_id, message, completed - issued)
+            latencies.append(completed - scheduled)
+            lags.append(max(issued - scheduled, 0.0))
+
+        return latencies, lags, metrics
+
+    def run(self, concurrency: int, replays: Optional[int] = None) -> ReplayReport:
+        """
+        Run many replays concurrently.
+
+        Args:
+            concurrency: Number of replays in flight at once
+            replays: Total replays to run (defaults to `concurrency`)
+
+        Returns:
+            Report aggregating every replayed event
+
+        Raises:
+            ValidationError: If concurrency or replays is not positive
+        """
+        replays = concurrency if replays is None else replays
+        if concurrency < 1 or replays < 1:
+            raise ValidationError("Concurrency and replay count must be positive")
+
+        assigned = [self.streams[i % len(self.streams)] for i in range(replays)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(self.replay_stream, assigned))
+        wall_seconds = time.perf_counter() - start
+
+        report = ReplayReport(concurrency, replays, sum(len(s) for s in assigned), wall_seconds)
+        for latencies, lags, metrics in results:
+            report.latencies.extend(latencies)
+            report.lags.extend(lags)
+            for agent_id, agent_metrics in metrics.agent_metrics.items():
+                report.agent_response_times.setdefault(agent_id, []).extend(
+                    agent_metrics.response_times)
+        return report
+
+    def find_saturation(self, levels: List[int],
+                        efficiency_threshold: float = 0.8) -> Tuple[List[ReplayReport], Optional[int]]:
+        """
+        Step through concurrency levels and locate where throughput stops scaling.
+
+        Args:
+            levels: Increasing concurrency levels to try
+            efficiency_threshold: Minimum fraction of the ideal (linear)
+                throughput gain a step must achieve to count as scaling
+
+        Returns:
+            Tuple of per-level reports and the first level that failed to
+            scale, or None if every step scaled
+        """
+        reports = []
+        saturation = None
+        for level in levels:
+            report = self.run(level)
+            if reports and saturation is None:
+                previous = reports[-1]
+                ideal_gain = level / previous.concurrency
+                actual_gain = report.throughput / previous.throughput if previous.throughput else 0.0
+                if actual_gain < ideal_gain * efficiency_threshold:
+                    saturation = level
+            reports.append(report)
+            logger.info(f"Replay concurrency {level}: {report.throughput:.2f} events/s, "
+                        f"p99 latency {percentile(report.latencies, 99):.3f}s")
+        return reports, saturation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured FARSI event streams")
+    parser.add_argument('event_files', nargs='+', help="simulation_events_*.json files to replay")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="time compression factor; 0 replays as fast as possible")
+    parser.add_argument('--concurrency', default='1',
+                        help="comma-separated concurrency levels, e.g. 1,2,4,8")
+    args = parser.parse_args()
+
+    try:
+        runner = ReplayRunner([load_events(path) for path in args.event_files], speed=args.speed)
+        levels = [int(level) for level in args.concurrency.split(',')]
+        reports, saturation = runner.find_saturation(levels)
+        for report in reports:
+            logger.info(json.dumps(report.get_summary()))
+        if saturation is not None:
+            logger.info(f"Throughput saturated at concurrency {saturation}")
+    except Exception as e:
+        logger.critical(f"Fatal error in replay: {str(e)}")
+        sys.exit(1)
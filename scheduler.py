@@ -0,0 +1,252 @@
+"""
+Turn scheduling for the FARSI discussion.
+
+Each agent prepares (generates) its next turn while others are speaking;
+the scheduler picks the next speaker among turns whose generation has
+finished, according to a pluggable policy, priorities, deadlines and a
+fairness quota.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from config import SCHEDULER_MAX_CONSECUTIVE, SCHEDULER_TURN_DEADLINE_SECONDS
+from exceptions import SimulationError, ValidationError
+
+
+@dataclass
+class PendingTurn:
+    """A scripted turn waiting to be spoken."""
+    turn_index: int
+    agent_id: str
+    message: str
+    priority: int = 0
+    ready_at: Optional[float] = None
+    deadline: Optional[float] = None
+    deadline_seconds: Optional[float] = None
+
+    @property
+    def sort_key(self):
+        """Higher priority first, then earliest deadline, readiness and script position."""
+        deadline = self.deadline if self.deadline is not None else float('inf')
+        return (-self.priority, deadline, self.ready_at, self.turn_index)
+
+    def lateness(self, now: float) -> float:
+        """Seconds past the deadline at `now` (0.0 if on time or without a deadline)."""
+        return max(0.0, now - self.deadline) if self.deadline is not None else 0.0
+
+
+class SchedulingPolicy:
+    """Base class deciding which turns may be spoken next and which one wins."""
+
+    name = 'base'
+
+    def eligible(self, heads: List[PendingTurn], pending_indices: List[int]) -> List[PendingTurn]:
+        """
+        Filter the agents' next turns down to those the policy allows now.
+
+        Args:
+            heads: Each agent's next unspoken turn
+            pending_indices: Script positions of every unspoken turn, sorted
+
+        Returns:
+            Turns that may be spoken once their generation is ready
+        """
+        return heads
+
+    def select(self, ready: List[PendingTurn]) -> PendingTurn:
+        """
+        Choose the next speaker among ready, eligible turns.
+
+        Args:
+            ready: Non-empty list of candidate turns
+
+        Returns:
+            The turn to speak next
+        """
+        return min(ready, key=lambda turn: turn.sort_key)
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    """Fixed script order: the next turn waits for its agent however long it takes."""
+
+    name = 'round_robin'
+
+    def eligible(self, heads: List[PendingTurn], pending_indices: List[int]) -> List[PendingTurn]:
+        return [turn for turn in heads if turn.turn_index == pending_indices[0]]
+
+
+class EarliestReadyPolicy(SchedulingPolicy):
+    """Whichever agent has a turn ready speaks next."""
+
+    name = 'earliest_ready'
+
+
+class ModeratorDrivenPolicy(SchedulingPolicy):
+    """
+    The moderator's turns act as barriers and panelists fill the gaps between them.
+
+    A moderator turn is spoken only after every earlier scripted turn, and a
+    panelist turn only after every earlier moderator turn; between two
+    moderator turns panelists speak in the order they become ready.
+    """
+
+    name = 'moderator'
+
+    def __init__(self, moderator_id: str = 'zeta'):
+        """
+        Initialize the policy.
+
+        Args:
+            moderator_id: Identifier of the moderating agent
+        """
+        self.moderator_id = moderator_id
+
+    def eligible(self, heads: List[PendingTurn], pending_indices: List[int]) -> List[PendingTurn]:
+        moderator_turns = [turn for turn in heads if turn.agent_id == self.moderator_id]
+        next_barrier = moderator_turns[0].turn_index if moderator_turns else float('inf')
+        return [
+            turn for turn in heads
+            if (turn.turn_index == pending_indices[0] if turn.agent_id == self.moderator_id
+                else turn.turn_index < next_barrier)
+        ]
+
+
+POLICIES = {
+    RoundRobinPolicy.name: RoundRobinPolicy,
+    EarliestReadyPolicy.name: EarliestReadyPolicy,
+    ModeratorDrivenPolicy.name: ModeratorDrivenPolicy
+}
+
+
+def create_policy(name: str) -> SchedulingPolicy:
+    """
+    Create a scheduling policy by name.
+
+    Args:
+        name: One of the keys of POLICIES
+
+    Returns:
+        The policy instance
+
+    Raises:
+        ValidationError: If the policy name is unknown
+    """
+    if name not in POLICIES:
+        raise ValidationError(f"Unknown scheduling policy {name}; expected one of {sorted(POLICIES)}")
+    return POLICIES[name]()
+
+
+class TurnScheduler:
+    """
+    Chooses the next speaker from turns whose generation has finished.
+
+    Each agent generates one turn at a time: its first turn starts generating
+    when the scheduler starts, and each later turn once the previous one has
+    been spoken. Generation time is the agent's provider latency, measured on
+    the scheduler's clock.
+    """
+
+    def __init__(self, policy: SchedulingPolicy, latencies: Dict[str, float], clock=time,
+                 max_consecutive: Optional[int] = SCHEDULER_MAX_CONSECUTIVE,
+                 deadline_seconds: Optional[float] = SCHEDULER_TURN_DEADLINE_SECONDS):
+        """
+        Initialize the turn scheduler.
+
+        Args:
+            policy: Policy deciding eligibility and selection
+            latencies: Generation latency per agent (seconds)
+            clock: Object providing time()/sleep() (defaults to the time module)
+            max_consecutive: Turns an agent may take in a row while another
+                agent is ready (None disables the quota)
+            deadline_seconds: Default time after generation starts by which a
+                turn should be spoken; earlier deadlines win ties (None disables)
+        """
+        self.policy = policy
+        self.latencies = latencies
+        self.clock = clock
+        self.max_consecutive = max_consecutive
+        self.deadline_seconds = deadline_seconds
+        self.idle_seconds = 0.0
+        self._queues: Dict[str, Deque[PendingTurn]] = {}
+        self._last_agent: Optional[str] = None
+        self._streak = 0
+
+    def add(self, turn_index: int, agent_id: str, message: str, priority: int = 0,
+            deadline_seconds: Optional[float] = None):
+        """
+        Queue a scripted turn; an agent's turns are spoken in the order added.
+
+        Args:
+            turn_index: Position of the turn in the script
+            agent_id: Identifier of the speaking agent
+            message: Message to be spoken
+            priority: Higher values are preferred among ready turns
+            deadline_seconds: Override for the scheduler's deadline_seconds
+        """
+        queue = self._queues.setdefault(agent_id, deque())
+        queue.append(PendingTurn(turn_index, agent_id, message, priority,
+                                 deadline_seconds=deadline_seconds))
+        if len(queue) == 1:
+            self._start_generation(queue[0])
+
+    def _start_generation(self, turn: PendingTurn):
+        """Begin generating a turn at the current time."""
+        now = self.clock.time()
+        turn.ready_at = now + self.latencies.get(turn.agent_id, 0.0)
+        deadline_seconds = (self.deadline_seconds if turn.deadline_seconds is None
+                            else turn.deadline_seconds)
+        if deadline_seconds is not None:
+            turn.deadline = now + deadline_seconds
+
+    def has_pending(self) -> bool:
+        """Whether any turn is still waiting to be spoken."""
+        return any(self._queues.values())
+
+    def next_turn(self) -> PendingTurn:
+        """
+        Wait for and return the next turn to speak.
+
+        Returns:
+            The selected turn, removed from its agent's queue
+
+        Raises:
+            SimulationError: If turns are pending but the policy allows none
+        """
+        while True:
+            heads = [queue[0] for queue in self._queues.values() if queue]
+            pending_indices = sorted(turn.turn_index for queue in self._queues.values()
+                                     for turn in queue)
+            eligible = self.policy.eligible(heads, pending_indices)
+            if not eligible:
+                raise SimulationError(f"Scheduling policy {self.policy.name} allows no pending turn")
+
+            now = self.clock.time()
+            ready = [turn for turn in eligible if turn.ready_at <= now]
+            if ready:
+                break
+            wait = min(turn.ready_at for turn in eligible) - now
+            self.clock.sleep(wait)
+            self.idle_seconds += wait
+
+        if (self.max_consecutive is not None and self._streak >= self.max_consecutive
+                and any(turn.agent_id != self._last_agent for turn in ready)):
+            ready = [turn for turn in ready if turn.agent_id != self._last_agent]
+
+        turn = self.policy.select(ready)
+        self._queues[turn.agent_id].popleft()
+        return turn
+
+    def complete(self, turn: PendingTurn):
+        """
+        Mark a turn as spoken and start generating its agent's next turn.
+
+        Args:
+            turn: The turn returned by next_turn
+        """
+        self._streak = self._streak + 1 if turn.agent_id == self._last_agent else 1
+        self._last_agent = turn.agent_id
+        queue = self._queues[turn.agent_id]
+        if queue:
+            self._start_generation(queue[0])
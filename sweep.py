@@ -0,0 +1,544 @@
+"""
+Distributed parameter sweeps for the FARSI simulation.
+
+A coordinator shards a sweep into work units and serves them over a plain
+TCP protocol: one newline-terminated JSON request and reply per connection.
+Workers lease a unit, renew the lease with heartbeats while they run it and
+send back a compact metric summary. Units whose lease expires (e.g. because
+the worker died) are handed out again.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from autotune import evaluate_config
+from config import (
+    SWEEP_HOST, SWEEP_PORT, SWEEP_LEASE_SECONDS, SWEEP_HEARTBEAT_SECONDS, TUNABLE_SETTINGS
+)
+from exceptions import SweepError
+from logger import logger
+from scheduler import POLICIES
+
+# Unit parameters applied to the simulation besides config.TUNABLE_SETTINGS
+AGENT_PARAMETERS = ('scheduler_policy', 'generation_latency', 'priority')
+SWEEP_PARAMETERS = frozenset(TUNABLE_SETTINGS) | frozenset(AGENT_PARAMETERS) | {'repetitions'}
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Check a sweep grid and expand it into work unit parameters.
+
+    Checking up front means a typo fails the sweep before any unit is leased,
+    instead of on every worker after max_attempts round trips.
+
+    Args:
+        grid: Candidate values per parameter
+
+    Returns:
+        One parameter dictionary per point of the Cartesian product
+
+    Raises:
+        SweepError: If the grid has unsupported parameters, a parameter
+            without candidate values or an unknown scheduling policy
+    """
+    unknown = set(grid) - SWEEP_PARAMETERS
+    if unknown:
+        raise SweepError(f"Unsupported sweep parameters: {sorted(unknown)}; "
+                         f"expected some of {sorted(SWEEP_PARAMETERS)}")
+    for name, values in grid.items():
+        if not isinstance(values, list) or not values:
+            raise SweepError(f"Sweep parameter {name} needs a non-empty list of values")
+    policies = [policy for policy in grid.get('scheduler_policy', [])
+                if not isinstance(policy, str) or policy not in POLICIES]
+    if policies:
+        raise SweepError(f"Unknown scheduling policies {policies}; "
+                         f"expected some of {sorted(POLICIES)}")
+
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_unit(params: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Run one work unit: a headless demonstration with the given settings.
+
+    Args:
+        params: Values for config.TUNABLE_SETTINGS, plus optionally a
+            'scheduler_policy' name, 'generation_latency' and 'priority'
+            mappings from agent id to value, and a 'repetitions' count
+
+    Returns:
+        Compact metric summary of the runs
+
+    Raises:
+        SweepError: If the unit has parameters the simulation cannot apply
+    """
+    settings = {name: value for name, value in params.items() if name in TUNABLE_SETTINGS}
+    extra = set(params) - SWEEP_PARAMETERS
+    if extra:
+        raise SweepError(f"Unsupported sweep parameters: {sorted(extra)}")
+    return evaluate_config(settings, params.get('repetitions', 1),
+                           scheduler_policy=params.get('scheduler_policy'),
+                           generation_latency=params.get('generation_latency'),
+                           priorities=params.get('priority'))
+
+
+def send_message(host: str, port: int, message: Dict[str, Any],
+                 timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Send one protocol message and wait for the reply.
+
+    Args:
+        host: Coordinator host
+        port: Coordinator port
+        message: JSON-serializable request
+        timeout: Socket timeout in seconds
+
+    Returns:
+        The decoded reply
+    """
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as reader:
+            line = reader.readline()
+    if not line:
+        raise SweepError("Coordinator closed the connection without replying")
+    return json.loads(line)
+
+
+class _SweepRequestHandler(socketserver.StreamRequestHandler):
+    """Decodes one request per connection and passes it to the coordinator."""
+
+    def handle(self):
+        try:
+            reply = self.server.coordinator.handle_message(json.loads(self.rfile.readline()))
+        except (ValueError, KeyError, TypeError) as e:
+            reply = {'type': 'error', 'error': f"Malformed message: {str(e)}"}
+        self.wfile.write(json.dumps(reply, separators=(',', ':')).encode('utf-8') + b'\n')
+
+
+class _SweepServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server bound to a coordinator."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SweepCoordinator:
+    """Hands out sweep work units under leases and merges the results."""
+
+    def __init__(self, units: List[Dict[str, Any]], host: str = SWEEP_HOST,
+                 port: int = SWEEP_PORT, lease_seconds: float = SWEEP_LEASE_SECONDS,
+                 max_attempts: int = 3):
+        """
+        Initialize the coordinator.
+
+        Args:
+            units: Parameters of each work unit
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            lease_seconds: Time a worker may hold a unit without a heartbeat
+            max_attempts: Times a unit is handed out before the sweep fails it
+
+        Raises:
+            SweepError: If there are no units or the settings are invalid
+        """
+        if not units:
+            raise SweepError("A sweep needs at least one work unit")
+        if lease_seconds <= 0 or max_attempts < 1:
+            raise SweepError("lease_seconds must be positive and max_attempts at least 1")
+
+        self.units = units
+        self.host = host
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._pending: Deque[int] = deque(range(len(units)))
+        self._leases: Dict[int, Tuple[str, float]] = {}
+        self._attempts: Dict[int, int] = {unit_id: 0 for unit_id in range(len(units))}
+        self._results: Dict[int, Dict[str, Any]] = {}
+        self._failures: Dict[int, str] = {}
+        self._server: Optional[_SweepServer] = None
+
+    def start(self) -> Tuple[str, int]:
+        """
+        Start serving work units in a background thread.
+
+        Returns:
+            The (host, port) the coordinator is listening on
+        """
+        self._server = _SweepServer((self.host, self.port), _SweepRequestHandler)
+        self._server.coordinator = self
+        self.host, self.port = self._server.server_address[:2]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Sweep coordinator serving {len(self.units)} units on {self.host}:{self.port}")
+        return self.host, self.port
+
+    def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _is_finished(self) -> bool:
+        """Whether every unit has a result or has exhausted its attempts."""
+        return len(self._results) + len(self._failures) == len(self.units)
+
+    def _reclaim_expired(self, now: float):
+        """Return units whose lease expired to the pending queue."""
+        for unit_id, (worker_id, expires) in list(self._leases.items()):
+            if expires > now:
+                continue
+            del self._leases[unit_id]
+            if self._attempts[unit_id] >= self.max_attempts:
+                self._failures[unit_id] = f"Lease expired {self._attempts[unit_id]} times"
+            else:
+                logger.warning(f"Lease on unit {unit_id} held by {worker_id} expired; reassigning")
+                self._pending.appendleft(unit_id)
+
+    def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process one protocol message.
+
+        Args:
+            message: Decoded request with a 'type' of lease, heartbeat,
+                result or failed
+
+        Returns:
+            The reply to send back; an 'error' reply for unknown types or
+            unit ids outside the sweep
+        """
+        kind = message['type']
+        worker_id = message['worker_id']
+        now = time.monotonic()
+
+        unit_id = message.get('unit_id')
+        if kind in ('heartbeat', 'result', 'failed') and not self._valid_unit(unit_id):
+            return {'type': 'error', 'error': f"Unknown unit id: {unit_id}"}
+
+        with self._lock:
+            self._reclaim_expired(now)
+
+            if kind == 'lease':
+                reply = self._lease(worker_id, now)
+            elif kind == 'heartbeat':
+                lease = self._leases.get(unit_id)
+                if lease is None or lease[0] != worker_id:
+                    reply = {'type': 'lost'}
+                else:
+                    self._leases[unit_id] = (worker_id, now + self.lease_seconds)
+                    reply = {'type': 'ok'}
+            elif kind == 'result':
+                self._leases.pop(unit_id, None)
+                if unit_id not in self._results:
+                    self._results[unit_id] = {
+                        'unit_id': unit_id,
+                        'params': self.units[unit_id],
+                        'summary': message['summary'],
+                        'worker_id': worker_id
+                    }
+                    self._failures.pop(unit_id, None)
+                    if unit_id in self._pending:
+                        self._pending.remove(unit_id)
+                reply = {'type': 'ok'}
+            elif kind == 'failed':
+                if self._leases.get(unit_id, (None,))[0] == worker_id:
+                    del self._leases[unit_id]
+                    if self._attempts[unit_id] >= self.max_attempts:
+                        self._failures[unit_id] = message.get('error', 'unknown error')
+                    else:
+                        self._pending.append(unit_id)
+                reply = {'type': 'ok'}
+            else:
+                reply = {'type': 'error', 'error': f"Unknown message type: {kind}"}
+
+            if self._is_finished():
+                self._finished.set()
+        return reply
+
+    def _valid_unit(self, unit_id: Any) -> bool:
+        """Whether a message refers to one of this sweep's units."""
+        return (isinstance(unit_id, int) and not isinstance(unit_id, bool)
+                and 0 <= unit_id < len(self.units))
+
+    def _lease(self, worker_id: str, now: float) -> Dict[str, Any]:
+        """Hand the next pending unit to a worker."""
+        if self._is_finished():
+            return {'type': 'done'}
+        if not self._pending:
+            return {'type': 'wait', 'retry_seconds': min(1.0, self.lease_seconds / 4)}
+
+        unit_id = self._pending.popleft()
+        self._attempts[unit_id] += 1
+        self._leases[unit_id] = (worker_id, now + self.lease_seconds)
+        logger.debug(f"Leased unit {unit_id} to {worker_id}")
+        return {'type': 'work', 'unit_id': unit_id, 'params': self.units[unit_id],
+                'lease_seconds': self.lease_seconds}
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, List[Any]]:
+        """
+        Block until every unit has finished, then return the merged report.
+
+        Expired leases are also reclaimed here, so a sweep whose workers all
+        died still notices when attempts run out. Failed or unfinished units
+        never discard the results that did complete.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            The report produced by report()
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._finished.wait(min(self.lease_seconds, 1.0)):
+            with self._lock:
+                self._reclaim_expired(time.monotonic())
+                if self._is_finished():
+                    self._finished.set()
+            if deadline is not None and time.monotonic() > deadline:
+                logger.warning(f"Sweep timed out with {len(self._results)}/{len(self.units)} "
+                               f"units done")
+                break
+
+        report = self.report()
+        if report['failures']:
+            logger.warning(f"{len(report['failures'])} sweep units failed")
+        return report
+
+    def report(self) -> Dict[str, List[Any]]:
+        """
+        Get the merged sweep outcome so far.
+
+        Returns:
+            Dictionary with 'results' ordered by unit id, 'failures' (unit id,
+            params and error of each unit that exhausted its attempts) and
+            'pending' (ids of units not finished yet)
+        """
+        with self._lock:
+            return {
+                'results': [self._results[unit_id] for unit_id in sorted(self._results)],
+                'failures': [
+                    {'unit_id': unit_id, 'params': self.units[unit_id], 'error': error}
+                    for unit_id, error in sorted(self._failures.items())
+                ],
+                'pending': [
+                    unit_id for unit_id in range(len(self.units))
+                    if unit_id not in self._results and unit_id not in self._failures
+                ]
+            }
+
+    def results(self) -> List[Dict[str, Any]]:
+        """
+        Get the results collected so far.
+
+        Returns:
+            Results ordered by unit id
+        """
+        with self._lock:
+            return [self._results[unit_id] for unit_id in sorted(self._results)]
+
+
+class SweepWorker:
+    """Pulls work units from a coordinator and runs them."""
+
+    def __init__(self, host: str = SWEEP_HOST, port: int = SWEEP_PORT,
+                 worker_id: Optional[str] = None,
+                 run: Callable[[Dict[str, Any]], Dict[str, float]] = run_unit,
+                 heartbeat_seconds: float = SWEEP_HEARTBEAT_SECONDS):
+        """
+        Initialize the worker.
+
+        Args:
+            host: Coordinator host
+            port: Coordinator port
+            worker_id: Identifier reported to the coordinator (generated if omitted)
+            run: Function turning unit parameters into a metric summary
+            heartbeat_seconds: Interval between lease renewals
+        """
+        self.host = host
+        self.port = port
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.run_unit = run
+        self.heartbeat_seconds = heartbeat_seconds
+        self.completed = 0
+
+    def _send(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a message tagged with this worker's id."""
+        return send_message(self.host, self.port, dict(message, worker_id=self.worker_id))
+
+    def _heartbeat(self, unit_id: int, interval: float, stop: threading.Event):
+        """Renew the lease on a unit until stopped or the lease is lost."""
+        while not stop.wait(interval):
+            try:
+                if self._send({'type': 'heartbeat', 'unit_id': unit_id})['type'] == 'lost':
+                    logger.warning(f"{self.worker_id} lost its lease on unit {unit_id}")
+                    return
+            except (OSError, SweepError) as e:
+                logger.warning(f"{self.worker_id} heartbeat failed: {str(e)}")
+
+    def run(self) -> int:
+        """
+        Process work units until the coordinator reports the sweep is done.
+
+        Returns:
+            Number of units this worker completed
+        """
+        while True:
+            try:
+                reply = self._send({'type': 'lease'})
+            except (OSError, SweepError) as e:
+                logger.info(f"{self.worker_id} cannot reach the coordinator ({str(e)}); stopping")
+                break
+
+            if reply['type'] == 'done':
+                break
+            if reply['type'] == 'wait':
+                time.sleep(reply.get('retry_seconds', 1.0))
+                continue
+            if reply['type'] != 'work':
+                logger.error(f"{self.worker_id} got unexpected coordinator reply {reply}; stopping")
+                break
+
+            unit_id = reply['unit_id']
+            interval = min(self.heartbeat_seconds, reply['lease_seconds'] / 3)
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat,
+                                         args=(unit_id, interval, stop), daemon=True)
+            heartbeat.start()
+            try:
+                summary = self.run_unit(reply['params'])
+                message = {'type': 'result', 'unit_id': unit_id, 'summary': summary}
+            except Exception as e:
+                logger.error(f"{self.worker_id} failed unit {unit_id}: {str(e)}")
+                message = {'type': 'failed', 'unit_id': unit_id, 'error': str(e)}
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            try:
+                reply = self._send(message)
+            except (OSError, SweepError) as e:
+                logger.info(f"{self.worker_id} cannot reach the coordinator ({str(e)}); stopping")
+                break
+            if reply['type'] == 'error':
+                logger.error(f"Coordinator rejected {message['type']} for unit {unit_id}: "
+                             f"{reply.get('error')}")
+                continue
+            if message['type'] == 'result':
+                self.completed += 1
+        return self.completed
+
+
+def _worker_process(host: str, port: int):
+    """Entry point for locally spawned worker processes."""
+    SweepWorker(host, port).run()
+
+
+def run_local_sweep(grid: Dict[str, List[Any]], workers: int = 2,
+                    timeout: Optional[float] = None) -> Dict[str, List[Any]]:
+    """
+    Run a sweep with a coordinator and worker processes on this machine.
+
+    Args:
+        grid: Candidate values per parameter
+        workers: Number of worker processes
+        timeout: Maximum seconds to wait for the sweep
+
+    Returns:
+        Merged report with results, failures and pending units
+    """
+    coordinator = SweepCoordinator(expand_grid(grid), port=0)
+    host, port = coordinator.start()
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(host, port), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        report = coordinator.wait(timeout)
+        # Keep serving until the workers have been told the sweep is done
+        for process in processes:
+            process.join(timeout=5)
+        return report
+    finally:
+        coordinator.stop()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def save_results(report: Dict[str, List[Any]], output_dir: str = 'metrics') -> str:
+    """
+    Save a merged sweep report to a JSON file.
+
+    Args:
+        report: Report returned by the coordinator
+        output_dir: Directory to save the results file
+
+    Returns:
+        Path of the written file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(output_dir, f'sweep_results_{timestamp}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed FARSI parameter sweeps")
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    coordinator_parser = subparsers.add_parser('coordinator', help="serve a sweep to workers")
+    coordinator_parser.add_argument('grid', help="JSON file mapping parameters to candidate values")
+    coordinator_parser.add_argument('--host', default=SWEEP_HOST)
+    coordinator_parser.add_argument('--port', type=int, default=SWEEP_PORT)
+
+    worker_parser = subparsers.add_parser('worker', help="run work units from a coordinator")
+    worker_parser.add_argument('--host', default=SWEEP_HOST)
+    worker_parser.add_argument('--port', type=int, default=SWEEP_PORT)
+
+    local_parser = subparsers.add_parser('local', help="coordinator plus local worker processes")
+    local_parser.add_argument('grid', help="JSON file mapping parameters to candidate values")
+    local_parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    try:
+        if args.mode == 'worker':
+            completed = SweepWorker(args.host, args.port).run()
+            logger.info(f"Worker finished after completing {completed} units")
+        else:
+            with open(args.grid) as f:
+                grid = json.load(f)
+            if args.mode == 'local':
+                report = run_local_sweep(grid, args.workers)
+            else:
+                coordinator = SweepCoordinator(expand_grid(grid), args.host, args.port)
+                coordinator.start()
+                try:
+                    report = coordinator.wait()
+                finally:
+                    coordinator.stop()
+            logger.info(f"Sweep results saved to {save_results(report)}")
+            if report['failures'] or report['pending']:
+                raise SweepError(f"{len(report['failures'])} units failed and "
+                                 f"{len(report['pending'])} did not finish")
+    except Exception as e:
+        logger.critical(f"Fatal error in sweep: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,145 @@
+"""Test cases for the FARSI parameter autotuner."""
+import unittest
+from unittest.mock import patch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from autotune import Autotuner, evaluate_config, write_profile
+from config import API_KEYS, load_profile
+from exceptions import ConfigurationError, ValidationError
+from farsi_simulation import DISCUSSION_SCRIPT
+
+
+class TestAutotuner(unittest.TestCase):
+    """Test cases for the Autotuner class."""
+
+    def setUp(self):
+        """Set up a fake evaluator recording its calls."""
+        self.calls = []
+
+        def evaluate(settings, budget):
+            self.calls.append((settings, budget))
+            duration = 100 * settings['TYPING_SPEED'] + settings['PAUSE_BETWEEN_AGENTS']
+            return {'duration': duration, 'p99_latency': settings['TYPING_SPEED'], 'cpu': duration}
+
+        self.evaluate = evaluate
+        self.space = {'TYPING_SPEED': [0.0, 0.1, 0.2], 'PAUSE_BETWEEN_AGENTS': [0.0, 1.0, 2.0]}
+
+    def test_successive_halving(self):
+        """Test candidates are halved while survivors get more budget."""
+        result = Autotuner(self.space, objective='cpu', evaluate=self.evaluate,
+                           minimums={}).run()
+        self.assertEqual(result.settings, {'TYPING_SPEED': 0.0, 'PAUSE_BETWEEN_AGENTS': 0.0})
+        budgets = [budget for _, budget in self.calls]
+        self.assertEqual(budgets, [1] * 9 + [3] * 3 + [9])
+
+    def test_deterministic_single_round(self):
+        """Test virtual-clock objectives are ranked from a single grid pass."""
+        result = Autotuner(self.space, objective='duration', target=12.0,
+                           evaluate=self.evaluate, minimums={}).run()
+        self.assertEqual(result.settings, {'TYPING_SPEED': 0.1, 'PAUSE_BETWEEN_AGENTS': 2.0})
+        self.assertEqual([budget for _, budget in self.calls], [1] * 9)
+
+    def test_target(self):
+        """Test a target selects the closest configuration."""
+        result = Autotuner(self.space, target=11.2, evaluate=self.evaluate, minimums={}).run()
+        self.assertEqual(result.settings, {'TYPING_SPEED': 0.1, 'PAUSE_BETWEEN_AGENTS': 1.0})
+        self.assertAlmostEqual(result.score, 0.2)
+
+    def test_target_required(self):
+        """Test virtual-clock objectives cannot simply be minimized."""
+        for objective in ('duration', 'p99_latency'):
+            with self.assertRaises(ValidationError):
+                Autotuner(self.space, objective=objective, evaluate=self.evaluate)
+
+    def test_minimums(self):
+        """Test settings below the readability minimums are never candidates."""
+        tuner = Autotuner(self.space, objective='cpu', evaluate=self.evaluate,
+                          minimums={'TYPING_SPEED': 0.1, 'PAUSE_BETWEEN_AGENTS': 1.0})
+        self.assertEqual(len(tuner.candidates()), 4)
+        self.assertEqual(tuner.run().settings, {'TYPING_SPEED': 0.1, 'PAUSE_BETWEEN_AGENTS': 1.0})
+        with self.assertRaises(ValidationError):
+            Autotuner(self.space, objective='cpu', minimums={'TYPING_SPEED': 1.0})
+
+    def test_invalid_objective(self):
+        """Test unknown objectives are rejected."""
+        with self.assertRaises(ValidationError):
+            Autotuner(self.space, objective='throughput')
+
+
+class TestEvaluateConfig(unittest.TestCase):
+    """Test cases for headless configuration evaluation."""
+
+    @patch.dict('config.API_KEYS', {provider: '' for provider in API_KEYS})
+    def test_runs_without_api_keys(self):
+        """Test headless evaluation works offline without provider keys."""
+        measurements = evaluate_config({'PAUSE_BETWEEN_AGENTS': 0.0})
+        self.assertIn('duration', measurements)
+
+    def test_virtual_time_duration(self):
+        """Test simulated duration follows the settings without real waiting."""
+        measurements = evaluate_config({'TYPING_SPEED': 0.01, 'PAUSE_BETWEEN_AGENTS': 2.0})
+        total_chars = sum(len(message) for _, message in DISCUSSION_SCRIPT)
+        expected = 0.01 * total_chars + 2.0 * len(DISCUSSION_SCRIPT)
+        self.assertAlmostEqual(measurements['duration'], expected, places=6)
+
+    def test_unknown_setting(self):
+        """Test settings outside TUNABLE_SETTINGS are rejected."""
+        with self.assertRaises(ValidationError):
+            evaluate_config({'API_KEYS': 1})
+
+
+class TestProfile(unittest.TestCase):
+    """Test cases for configuration override profiles."""
+
+    def setUp(self):
+        """Set up a temporary profile path."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'profile.json')
+
+    def tearDown(self):
+        """Remove the temporary profile."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(self.tmp_dir)
+
+    def test_round_trip(self):
+        """Test a written profile loads back as overrides."""
+        write_profile({'TYPING_SPEED': 0.01}, self.path)
+        self.assertEqual(load_profile(self.path), {'TYPING_SPEED': 0.01})
+
+    def test_missing_profile(self):
+        """Test a missing profile means no overrides."""
+        self.assertEqual(load_profile(self.path), {})
+
+    def test_unknown_setting(self):
+        """Test profiles cannot override arbitrary settings."""
+        with open(self.path, 'w') as f:
+            json.dump({'API_KEYS': {}}, f)
+        with self.assertRaises(ConfigurationError):
+            load_profile(self.path)
+
+    def test_invalid_values(self):
+        """Test profile values must be non-negative numbers."""
+        for value in ("fast", -0.5, True, None):
+            with open(self.path, 'w') as f:
+                json.dump({'TYPING_SPEED': value}, f)
+            with self.assertRaises(ConfigurationError):
+                load_profile(self.path)
+
+    def test_malformed_profile_ignored_on_import(self):
+        """Test a malformed profile does not stop config from importing."""
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        env = dict(os.environ, FARSI_PROFILE=self.path)
+        code = "import config; print(config.TYPING_SPEED)"
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.dirname(__file__)) or '.')
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Test cases for FARSI checkpointing."""
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+
+from checkpoint import CheckpointManager
+from config import AGENT_CONFIG
+from exceptions import CheckpointError, SimulationError
+from farsi_simulation import FARSISimulation, DISCUSSION_SCRIPT
+from utils import VirtualClock
+
+
+class TestCheckpointManager(unittest.TestCase):
+    """Test cases for the CheckpointManager class."""
+
+    def setUp(self):
+        """Set up a temporary checkpoint directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'checkpoint.json')
+
+    def tearDown(self):
+        """Remove the temporary checkpoint directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_save_and_load(self):
+        """Test a checkpoint round-trips without leaving temp files."""
+        manager = CheckpointManager(self.path, every_turns=1, every_seconds=None)
+        manager.save({'turn_index': 3, 'conversation': [{'agent_id': 'zeta', 'message': 'Hi'}]})
+
+        state = CheckpointManager(self.path).load()
+        self.assertEqual(state['turn_index'], 3)
+        self.assertEqual(state['conversation'][0]['agent_id'], 'zeta')
+        self.assertEqual(os.listdir(self.tmp_dir), ['checkpoint.json'])
+
+    def test_load_missing(self):
+        """Test loading when no checkpoint exists."""
+        self.assertIsNone(CheckpointManager(self.path).load())
+
+    def test_load_corrupt(self):
+        """Test loading a corrupt checkpoint."""
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        with self.assertRaises(CheckpointError):
+            CheckpointManager(self.path).load()
+
+    def test_turn_interval(self):
+        """Test checkpoints are due every N turns."""
+        manager = CheckpointManager(self.path, every_turns=2, every_seconds=None)
+        self.assertFalse(manager.should_checkpoint(1))
+        self.assertTrue(manager.should_checkpoint(2))
+        manager.save({'turn_index': 2})
+        self.assertFalse(manager.should_checkpoint(3))
+        self.assertTrue(manager.should_checkpoint(4))
+
+    def test_invalid_interval(self):
+        """Test validation of checkpoint intervals."""
+        with self.assertRaises(CheckpointError):
+            CheckpointManager(self.path, every_turns=0)
+
+
+@patch('farsi_simulation.PAUSE_BETWEEN_AGENTS', 0)
+@patch('farsi_simulation.validate_api_keys', return_value=True)
+class TestSimulationResume(unittest.TestCase):
+    """Test cases for resuming a failed simulation."""
+
+    def setUp(self):
+        """Set up a temporary checkpoint directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'checkpoint.json')
+
+    def tearDown(self):
+        """Remove the temporary checkpoint directory."""
+        shutil.rmtree(self.tmp_dir)
+
+    @patch('metrics.MetricsCollector.save_metrics')
+    @patch('agents.base_agent.AIAgent.speak')
+    def test_resume_after_failure(self, mock_speak, mock_save, mock_validate):
+        """Test a failed run resumes from the failing turn with its metrics intact."""
+        mock_speak.side_effect = [1.0, 1.0, 1.0, Exception("Provider down")]
+        simulation = FARSISimulation(checkpoints=CheckpointManager(self.path))
+        with self.assertRaises(SimulationError):
+            simulation.run_demonstration()
+
+        state = CheckpointManager(self.path).load()
+        self.assertEqual(state['turn_index'], 3)
+        self.assertEqual(len(state['conversation']), 3)
+
+        mock_speak.reset_mock(side_effect=True)
+        mock_speak.return_value = 1.0
+        resumed = FARSISimulation(checkpoints=CheckpointManager(self.path))
+        resumed.run_demonstration(resume=True)
+
+        self.assertEqual(mock_speak.call_count, len(DISCUSSION_SCRIPT) - 3)
+        self.assertEqual(resumed.metrics.get_summary()['total_messages'], len(DISCUSSION_SCRIPT))
+        self.assertFalse(os.path.exists(self.path))
+
+    @patch('metrics.MetricsCollector.save_metrics')
+    @patch('agents.base_agent.AIAgent.speak')
+    def test_resume_counts_scheduling_once(self, mock_speak, mock_save, mock_validate):
+        """Test a failed turn's scheduling delay and deadline miss are not recorded twice."""
+        mock_speak.side_effect = [1.0, Exception("Provider down")]
+        options = {'clock': VirtualClock(), 'generation_latency': {'alpha': 5.0}}
+        with patch.dict(AGENT_CONFIG, {'alpha': dict(AGENT_CONFIG['alpha'], deadline=1.0)}):
+            simulation = FARSISimulation(checkpoints=CheckpointManager(self.path), **options)
+            with self.assertRaises(SimulationError):
+                simulation.run_demonstration()
+
+            mock_speak.reset_mock(side_effect=True)
+            mock_speak.return_value = 1.0
+            resumed = FARSISimulation(checkpoints=CheckpointManager(self.path), **options)
+            resumed.run_demonstration(resume=True)
+
+        for agent_id, metrics in resumed.metrics.agent_metrics.items():
+            self.assertEqual(len(metrics.scheduling_delays), metrics.messages_sent, agent_id)
+        self.assertEqual(resumed.metrics.agent_metrics['alpha'].deadline_misses, 1)
+
+    def test_failed_resume_keeps_checkpoint(self, mock_validate):
+        """Test an unreadable or wrong-version checkpoint survives a failed resume."""
+        for contents in ('{not json', '{"version":2,"turn_index":5,"spoken_turns":[0,1,2,3,4]}'):
+            with open(self.path, 'w') as f:
+                f.write(contents)
+            simulation = FARSISimulation(checkpoints=CheckpointManager(self.path))
+            with self.assertRaises(SimulationError):
+                simulation.run_demonstration(resume=True)
+            with open(self.path) as f:
+                self.assertEqual(f.read(), contents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Test cases for the conversation history index."""
+import unittest
+
+from exceptions import ValidationError
+from farsi_simulation import DISCUSSION_SCRIPT
+from history_index import HistoryIndex, tokenize
+
+
+class TestHistoryIndex(unittest.TestCase):
+    """Test cases for the HistoryIndex class."""
+
+    def setUp(self):
+        """Index the scripted discussion."""
+        self.index = HistoryIndex()
+        for agent_id, message in DISCUSSION_SCRIPT:
+            self.index.add(agent_id, message)
+
+    def test_tokenize(self):
+        """Test stopwords and short words are dropped."""
+        self.assertEqual(tokenize("The safety of AI alignment"), {'safety', 'alignment'})
+
+    def test_query_finds_relevant_turn(self):
+        """Test the most similar turn ranks first."""
+        results = self.index.query("safety mechanisms and alignment with human values", k=2)
+        self.assertTrue(results)
+        self.assertEqual(results[0].agent_id, 'gamma')
+        self.assertGreaterEqual(results[0].score, results[-1].score)
+
+    def test_query_exclude_agent(self):
+        """Test turns from the excluded agent are skipped."""
+        results = self.index.query("hardware utilization and processing architectures",
+                                   k=5, exclude_agent='epsilon')
+        self.assertNotIn('epsilon', [turn.agent_id for turn in results])
+
+    def test_query_turn_excludes_itself(self):
+        """Test querying by turn id returns k other turns from its cached signature."""
+        index = HistoryIndex()
+        first = index.add('gamma', "Safety mechanisms keep alignment with human values")
+        index.add('beta', "Safety mechanisms and alignment with human values matter")
+        latest = index.add('zeta', "Safety mechanisms alignment human values")
+        results = index.query_turn(latest, k=2)
+        self.assertEqual(len(results), 2)
+        self.assertNotIn(latest, [turn.turn_id for turn in results])
+        self.assertEqual(index.query("Safety mechanisms alignment human values", k=2,
+                                     exclude_turn_id=latest), results)
+        self.assertNotIn(first, [turn.turn_id for turn in
+                                 index.query_turn(latest, k=2, exclude_agent='gamma')])
+
+    def test_query_turn_unknown(self):
+        """Test querying by a turn id that is not indexed is rejected."""
+        with self.assertRaises(ValidationError):
+            self.index.query_turn(len(DISCUSSION_SCRIPT))
+
+    def test_query_without_content_words(self):
+        """Test queries with no content words return nothing."""
+        self.assertEqual(self.index.query("and the of"), [])
+
+    def test_eviction_bounds_memory(self):
+        """Test the oldest turns are evicted beyond max_turns."""
+        index = HistoryIndex(max_turns=2)
+        index.add('gamma', "Safety mechanisms keep alignment with human values")
+        index.add('alpha', "Algorithms modify their own source code")
+        index.add('epsilon', "Hardware utilization and memory management")
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.query("safety mechanisms alignment human values"), [])
+
+    def test_invalid_bands(self):
+        """Test bands must divide the number of permutations."""
+        with self.assertRaises(ValidationError):
+            HistoryIndex(num_perm=64, bands=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
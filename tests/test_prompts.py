@@ -0,0 +1,109 @@
+"""Test cases for FARSI prompt assembly."""
+import unittest
+from unittest.mock import patch
+
+from agents import AlgorithmAgent, ModeratorAgent
+from farsi_simulation import DISCUSSION_SCRIPT, FARSISimulation
+from history_index import HistoryIndex, IndexedTurn
+from prompts import (PromptAssembler, assemble_turn_prompt, build_full_prompt, count_tokens,
+                     measure_assembly)
+
+
+class TestPromptAssembler(unittest.TestCase):
+    """Test cases for the PromptAssembler class."""
+
+    def setUp(self):
+        """Set up an assembler and agents."""
+        self.assembler = PromptAssembler()
+        self.moderator = ModeratorAgent()
+        self.algorithm = AlgorithmAgent()
+
+    def test_prefix_compiled_once(self):
+        """Test the persona prefix is cached per agent."""
+        first = self.assembler.prefix_for('zeta', self.moderator)
+        second = self.assembler.prefix_for('zeta', self.moderator)
+        self.assertIs(first, second)
+        self.assertIn(self.moderator.name, first.text)
+        self.assertEqual(first.encoded, first.text.encode('utf-8'))
+        self.assertEqual(first.token_count, count_tokens(first.text))
+
+    def test_build(self):
+        """Test prompts are prefix plus context and latest turn."""
+        context = [IndexedTurn(0, 'zeta', "Welcome to FARSI.", 0.5)]
+        latest = IndexedTurn(1, 'beta', "Recursion compounds gains.", 1.0)
+        prompt = self.assembler.build('alpha', self.algorithm, context, latest)
+
+        self.assertTrue(prompt.encoded.startswith(prompt.prefix.encoded))
+        self.assertEqual(prompt.suffix,
+                         b"[zeta] Welcome to FARSI.\n[beta] Recursion compounds gains.\n")
+        self.assertEqual(prompt.size, len(prompt.encoded))
+
+    def test_latest_not_duplicated(self):
+        """Test the latest turn is not repeated when it is also relevant context."""
+        latest = IndexedTurn(1, 'beta', "Recursion compounds gains.", 1.0)
+        prompt = self.assembler.build('alpha', self.algorithm, [latest], latest)
+        self.assertEqual(prompt.suffix.count(b"Recursion"), 1)
+
+    def test_assemble_turn_prompt_context_size(self):
+        """Test k relevant turns are included besides the latest turn."""
+        conversation = [
+            {'agent_id': 'beta', 'message': "Safety mechanisms keep alignment with human values"},
+            {'agent_id': 'gamma', 'message': "Alignment with human values needs safety mechanisms"},
+            {'agent_id': 'delta', 'message': "Human values and safety mechanisms guide alignment"},
+            {'agent_id': 'zeta', 'message': "Safety mechanisms alignment human values"}
+        ]
+        index = HistoryIndex()
+        for turn in conversation:
+            index.add(turn['agent_id'], turn['message'])
+
+        prompt = assemble_turn_prompt(self.assembler, index, conversation, 'alpha',
+                                      self.algorithm, k=3)
+        lines = prompt.suffix.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[-1], "[zeta] Safety mechanisms alignment human values")
+
+    def test_payload_cache_marker(self):
+        """Test only caching providers get a cache marker on the prefix."""
+        cached = self.assembler.build('zeta', self.moderator, []).to_payload()
+        plain = self.assembler.build('alpha', self.algorithm, []).to_payload()
+        self.assertIn('cache_control', cached['system'][0])
+        self.assertNotIn('cache_control', plain['system'][0])
+
+
+class TestMeasureAssembly(unittest.TestCase):
+    """Test cases for the before/after assembly measurement."""
+
+    def test_payload_bounded(self):
+        """Test cached prompts stay smaller than full-transcript prompts."""
+        agents = {agent_id: ModeratorAgent() for agent_id, _ in DISCUSSION_SCRIPT}
+        results = measure_assembly(agents, DISCUSSION_SCRIPT, rounds=3)
+        self.assertLess(results['cached_bytes'], results['full_bytes'])
+        self.assertGreater(len(build_full_prompt(agents['zeta'], [])), 0)
+
+
+class TestSimulationPrompts(unittest.TestCase):
+    """Test cases for prompt assembly within the simulation."""
+
+    def _run(self, save_metrics):
+        simulation = FARSISimulation(typing_speed=0.0, pause_between_agents=0.0,
+                                     headless=True, require_api_keys=False)
+        with patch('metrics.MetricsCollector.save_metrics'):
+            simulation.run_demonstration(save_metrics=save_metrics)
+        return simulation.metrics.agent_metrics
+
+    def test_cached_prefix_only_for_caching_providers(self):
+        """Test prefix bytes count as cached only for providers that cache prompts."""
+        agent_metrics = self._run(save_metrics=True)
+        self.assertEqual(agent_metrics['zeta'].prompts_built, 2)
+        self.assertGreater(agent_metrics['zeta'].cached_prefix_bytes, 0)
+        self.assertEqual(agent_metrics['alpha'].prompts_built, 1)
+        self.assertEqual(agent_metrics['alpha'].cached_prefix_bytes, 0)
+
+    def test_no_assembly_without_metrics(self):
+        """Test runs that do not save metrics skip prompt assembly."""
+        agent_metrics = self._run(save_metrics=False)
+        self.assertTrue(all(metrics.prompts_built == 0 for metrics in agent_metrics.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Test cases for the FARSI replay load generator."""
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+from exceptions import ValidationError
+from metrics import MetricsCollector
+from replay import ReplayRunner, ReplayEvent, load_events
+from utils import VirtualClock, percentile
+
+EVENTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'metrics', 'simulation_events_20250203_183547.json'
+)
+
+
+class TestLoadEvents(unittest.TestCase):
+    """Test cases for loading captured event streams."""
+
+    def test_load_captured_stream(self):
+        """Test offsets are recovered from a captured stream."""
+        events = load_events(EVENTS_FILE)
+        self.assertEqual(len(events), 7)
+        self.assertEqual(events[0].agent_id, 'zeta')
+        self.assertEqual(events[0].offset, 0.0)
+        offsets = [event.offset for event in events]
+        self.assertEqual(offsets, sorted(offsets))
+
+    def test_load_malformed_stream(self):
+        """Test malformed streams are rejected."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump([{'agent_id': 'zeta'}], f)
+        try:
+            with self.assertRaises(ValidationError):
+                load_events(f.name)
+        finally:
+            os.remove(f.name)
+
+    def test_load_virtual_clock_stream(self):
+        """Test streams recorded on a virtual clock keep their simulated offsets."""
+        clock = VirtualClock(start=1_000_000.0)
+        collector = MetricsCollector(clock=clock)
+        clock.sleep(2.0)
+        collector.record_message('zeta', 'Welcome', 2.0)
+        clock.sleep(3.0)
+        collector.record_message('beta', 'Thanks', 1.0)
+
+        output_dir = tempfile.mkdtemp()
+        try:
+            collector.save_metrics(output_dir)
+            events_file = next(os.path.join(output_dir, name) for name in os.listdir(output_dir)
+                               if name.startswith('simulation_events_'))
+            events = load_events(events_file)
+        finally:
+            shutil.rmtree(output_dir)
+        self.assertEqual([event.offset for event in events], [0.0, 4.0])
+
+
+class TestReplayRunner(unittest.TestCase):
+    """Test cases for the ReplayRunner class."""
+
+    def test_run_as_fast_as_possible(self):
+        """Test concurrent replays complete every event."""
+        runner = ReplayRunner([load_events(EVENTS_FILE)], speed=0)
+        report = runner.run(concurrency=3)
+        self.assertEqual(report.events, 21)
+        self.assertEqual(len(report.latencies), 21)
+        summary = report.get_summary()
+        self.assertGreater(summary['throughput'], 0)
+        self.assertLessEqual(summary['latency_p50'], summary['latency_p99'])
+        self.assertEqual(sum(len(times) for times in report.agent_response_times.values()), 21)
+        self.assertEqual(len(report.agent_response_times['zeta']), 6)
+        self.assertIn('alpha', summary['agent_response_p99'])
+
+    def test_time_compression(self):
+        """Test replays honour the recorded pacing scaled by speed."""
+        stream = [ReplayEvent('alpha', 0.0, 20, 1.0), ReplayEvent('beta', 2.0, 20, 1.0)]
+        report = ReplayRunner([stream], speed=20).run(concurrency=1)
+        self.assertGreaterEqual(report.wall_seconds, 0.15)
+
+    def test_find_saturation(self):
+        """Test a report is produced per concurrency level."""
+        runner = ReplayRunner([load_events(EVENTS_FILE)], speed=0)
+        reports, _ = runner.find_saturation([1, 2])
+        self.assertEqual([report.concurrency for report in reports], [1, 2])
+
+    def test_unknown_agent(self):
+        """Test streams referencing unknown agents are rejected."""
+        with self.assertRaises(ValidationError):
+            ReplayRunner([[ReplayEvent('omega', 0.0, 10, 0.1)]])
+
+
+class TestPercentile(unittest.TestCase):
+    """Test cases for the percentile helper."""
+
+    def test_percentile(self):
+        """Test interpolated percentiles."""
+        self.assertEqual(percentile([], 99), 0.0)
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertAlmostEqual(percentile([0, 10], 90), 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
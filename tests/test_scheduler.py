@@ -0,0 +1,145 @@
+"""Test cases for the FARSI turn scheduler."""
+import unittest
+from unittest.mock import patch
+
+from config import AGENT_CONFIG
+from exceptions import SimulationError, ValidationError
+from farsi_simulation import FARSISimulation
+from scheduler import (
+    EarliestReadyPolicy, ModeratorDrivenPolicy, RoundRobinPolicy, TurnScheduler, create_policy
+)
+from utils import VirtualClock
+
+SCRIPT = [('zeta', 'open'), ('alpha', 'a'), ('beta', 'b'), ('gamma', 'c'), ('zeta', 'close')]
+LATENCIES = {'zeta': 1.0, 'alpha': 10.0, 'beta': 2.0, 'gamma': 3.0}
+
+
+def run_schedule(policy):
+    """Drain a scheduler over SCRIPT, taking one virtual second per spoken turn."""
+    clock = VirtualClock()
+    scheduler = TurnScheduler(policy, LATENCIES, clock)
+    for turn_index, (agent_id, message) in enumerate(SCRIPT):
+        scheduler.add(turn_index, agent_id, message)
+    order = []
+    while scheduler.has_pending():
+        turn = scheduler.next_turn()
+        order.append(turn.turn_index)
+        clock.sleep(1.0)
+        scheduler.complete(turn)
+    return order, scheduler, clock
+
+
+class TestPolicies(unittest.TestCase):
+    """Test cases for the scheduling policies."""
+
+    def test_round_robin_keeps_script_order(self):
+        """Test round-robin waits for each turn in script order."""
+        order, scheduler, clock = run_schedule(RoundRobinPolicy())
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+        self.assertGreater(scheduler.idle_seconds, 0)
+
+    def test_earliest_ready_skips_slow_agent(self):
+        """Test ready agents speak while a slow agent is still generating."""
+        order, scheduler, _ = run_schedule(EarliestReadyPolicy())
+        self.assertLess(order.index(2), order.index(1))
+        self.assertLess(order.index(3), order.index(1))
+
+    def test_moderator_barriers(self):
+        """Test the moderator opens and closes while panelists reorder freely."""
+        order, moderated, moderated_clock = run_schedule(ModeratorDrivenPolicy())
+        self.assertEqual(order[0], 0)
+        self.assertEqual(order[-1], 4)
+        self.assertEqual(order[1:4], [2, 3, 1])
+
+        _, _, fixed_clock = run_schedule(RoundRobinPolicy())
+        self.assertLess(moderated_clock.time(), fixed_clock.time())
+
+    def test_priority(self):
+        """Test higher priority wins among ready turns."""
+        clock = VirtualClock()
+        scheduler = TurnScheduler(EarliestReadyPolicy(), {}, clock)
+        scheduler.add(0, 'alpha', 'a')
+        scheduler.add(1, 'beta', 'b', priority=5)
+        self.assertEqual(scheduler.next_turn().agent_id, 'beta')
+
+    def test_deadline_changes_speaker(self):
+        """Test a tighter per-agent deadline wins among equally ready turns."""
+        def first_speaker(beta_deadline):
+            scheduler = TurnScheduler(EarliestReadyPolicy(), {}, VirtualClock(),
+                                      deadline_seconds=5.0)
+            scheduler.add(0, 'alpha', 'a')
+            scheduler.add(1, 'beta', 'b', deadline_seconds=beta_deadline)
+            return scheduler.next_turn().agent_id
+
+        self.assertEqual(first_speaker(None), 'alpha')
+        self.assertEqual(first_speaker(2.0), 'beta')
+
+    def test_lateness(self):
+        """Test lateness is measured from the turn's deadline."""
+        clock = VirtualClock()
+        scheduler = TurnScheduler(RoundRobinPolicy(), {'alpha': 3.0}, clock)
+        scheduler.add(0, 'alpha', 'a', deadline_seconds=1.0)
+        turn = scheduler.next_turn()
+        self.assertAlmostEqual(turn.lateness(clock.time()), 2.0)
+        self.assertEqual(turn.lateness(0.5), 0.0)
+
+    def test_fairness_quota(self):
+        """Test an agent cannot monopolize the floor while others are ready."""
+        scheduler = TurnScheduler(EarliestReadyPolicy(), {}, VirtualClock(), max_consecutive=2)
+        for turn_index, message in enumerate(['a1', 'a2', 'a3']):
+            scheduler.add(turn_index, 'alpha', message, priority=1)
+        scheduler.add(3, 'beta', 'b')
+        order = []
+        while scheduler.has_pending():
+            turn = scheduler.next_turn()
+            order.append(turn.turn_index)
+            scheduler.complete(turn)
+        self.assertEqual(order, [0, 1, 3, 2])
+
+    def test_create_policy(self):
+        """Test policies are created by name."""
+        self.assertIsInstance(create_policy('moderator'), ModeratorDrivenPolicy)
+        with self.assertRaises(ValidationError):
+            create_policy('lottery')
+
+
+@patch('farsi_simulation.validate_api_keys', return_value=True)
+class TestSimulationScheduling(unittest.TestCase):
+    """Test cases for scheduling within the simulation."""
+
+    def _run(self, policy):
+        simulation = FARSISimulation(
+            typing_speed=0.01, pause_between_agents=0.0, clock=VirtualClock(), headless=True,
+            scheduler_policy=policy, generation_latency={'alpha': 20.0}
+        )
+        simulation.run_demonstration(save_metrics=False)
+        return simulation
+
+    def test_heterogeneous_latency(self, mock_validate):
+        """Test the moderator policy reduces idle time behind a slow agent."""
+        fixed = self._run('round_robin')
+        moderated = self._run('moderator')
+
+        self.assertLess(moderated.metrics.idle_seconds, fixed.metrics.idle_seconds)
+        self.assertGreater(moderated.metrics.get_summary()['messages_per_second'],
+                           fixed.metrics.get_summary()['messages_per_second'])
+        self.assertEqual(moderated.conversation[-1]['agent_id'], 'zeta')
+        self.assertTrue(moderated.metrics.agent_metrics['beta'].scheduling_delays)
+
+    def test_deadline_misses(self, mock_validate):
+        """Test turns spoken after their agent's deadline are counted."""
+        with patch.dict(AGENT_CONFIG, {'alpha': dict(AGENT_CONFIG['alpha'], deadline=5.0)}):
+            simulation = self._run('earliest_ready')
+
+        summary = simulation.metrics.get_summary()
+        self.assertEqual(summary['deadline_misses'], 1)
+        self.assertEqual(summary['agent_summaries']['alpha']['deadline_misses'], 1)
+
+    def test_unknown_policy(self, mock_validate):
+        """Test an unknown policy fails initialization."""
+        with self.assertRaises(SimulationError):
+            FARSISimulation(scheduler_policy='lottery')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Test cases for distributed parameter sweeps."""
+import unittest
+from unittest.mock import patch
+import threading
+
+from config import API_KEYS
+from exceptions import SimulationError, SweepError
+from sweep import SweepCoordinator, SweepWorker, expand_grid, run_unit, send_message
+
+
+def fake_run(params):
+    """Stand-in for a simulation run returning a compact summary."""
+    return {'duration': params['TYPING_SPEED'] * 100 + params['PAUSE_BETWEEN_AGENTS']}
+
+
+class TestSweep(unittest.TestCase):
+    """Test cases for the sweep coordinator and workers."""
+
+    def setUp(self):
+        """Set up a sweep grid."""
+        self.grid = {'TYPING_SPEED': [0.0, 0.01, 0.02], 'PAUSE_BETWEEN_AGENTS': [0.0, 1.0]}
+
+    def _start(self, lease_seconds=5.0):
+        coordinator = SweepCoordinator(expand_grid(self.grid), port=0, lease_seconds=lease_seconds)
+        self.addCleanup(coordinator.stop)
+        return coordinator, coordinator.start()
+
+    def test_expand_grid(self):
+        """Test the grid expands to its Cartesian product."""
+        units = expand_grid(self.grid)
+        self.assertEqual(len(units), 6)
+        self.assertIn({'TYPING_SPEED': 0.02, 'PAUSE_BETWEEN_AGENTS': 1.0}, units)
+
+    def test_workers_merge_results(self):
+        """Test several workers complete the sweep into one result set."""
+        coordinator, (host, port) = self._start()
+        workers = [SweepWorker(host, port, f"worker-{i}", run=fake_run) for i in range(3)]
+        threads = [threading.Thread(target=worker.run) for worker in workers]
+        for thread in threads:
+            thread.start()
+        results = coordinator.wait(timeout=10)['results']
+        for thread in threads:
+            thread.join(timeout=10)
+
+        self.assertEqual([result['unit_id'] for result in results], list(range(6)))
+        for result in results:
+            self.assertEqual(result['summary'], fake_run(result['params']))
+        self.assertEqual(sum(worker.completed for worker in workers), 6)
+
+    def test_dead_worker_reassigned(self):
+        """Test a unit leased by a worker that stops heartbeating is reassigned."""
+        coordinator, (host, port) = self._start(lease_seconds=0.2)
+        lease = send_message(host, port, {'type': 'lease', 'worker_id': 'dead'})
+        self.assertEqual(lease['type'], 'work')
+
+        worker = SweepWorker(host, port, 'alive', run=fake_run)
+        threading.Thread(target=worker.run, daemon=True).start()
+        results = coordinator.wait(timeout=10)['results']
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[lease['unit_id']]['worker_id'], 'alive')
+
+    def test_heartbeat_after_reassignment(self):
+        """Test a worker learns its lease was lost."""
+        coordinator, (host, port) = self._start(lease_seconds=0.05)
+        lease = send_message(host, port, {'type': 'lease', 'worker_id': 'slow'})
+        threading.Event().wait(0.1)
+        reply = send_message(host, port, {'type': 'heartbeat', 'worker_id': 'slow',
+                                          'unit_id': lease['unit_id']})
+        self.assertEqual(reply['type'], 'lost')
+
+    def test_malformed_message(self):
+        """Test malformed requests get an error reply."""
+        coordinator, (host, port) = self._start()
+        self.assertEqual(send_message(host, port, {'type': 'lease'})['type'], 'error')
+
+    def test_unknown_unit_id(self):
+        """Test messages about units outside the sweep are rejected."""
+        coordinator, _ = self._start()
+        for kind in ('heartbeat', 'result', 'failed'):
+            for unit_id in (-1, 6, 'x'):
+                reply = coordinator.handle_message({'type': kind, 'worker_id': 'w',
+                                                    'unit_id': unit_id, 'summary': {}})
+                self.assertEqual(reply['type'], 'error')
+        self.assertEqual(coordinator.results(), [])
+        self.assertFalse(coordinator._finished.is_set())
+
+    def test_worker_stops_on_error_reply(self):
+        """Test a worker stops when the coordinator rejects or drops its lease request."""
+        worker = SweepWorker('localhost', 0, 'w', run=fake_run)
+        with patch.object(worker, '_send', return_value={'type': 'error', 'error': 'bad'}):
+            self.assertEqual(worker.run(), 0)
+        with patch.object(worker, '_send', side_effect=SweepError("closed")):
+            self.assertEqual(worker.run(), 0)
+
+    def test_failed_unit_keeps_results(self):
+        """Test a unit that exhausts its attempts does not discard the other results."""
+        def flaky_run(params):
+            if params == {'TYPING_SPEED': 0.02, 'PAUSE_BETWEEN_AGENTS': 1.0}:
+                raise ValueError("provider down")
+            return fake_run(params)
+
+        coordinator = SweepCoordinator(expand_grid(self.grid), port=0, max_attempts=2)
+        self.addCleanup(coordinator.stop)
+        host, port = coordinator.start()
+        SweepWorker(host, port, 'w', run=flaky_run).run()
+        report = coordinator.wait(timeout=10)
+
+        self.assertEqual(len(report['results']), 5)
+        self.assertEqual([failure['unit_id'] for failure in report['failures']], [5])
+        self.assertEqual(report['failures'][0]['error'], "provider down")
+        self.assertEqual(report['pending'], [])
+
+    def test_timeout_reports_pending(self):
+        """Test a timed-out sweep still reports which units are unfinished."""
+        coordinator, _ = self._start()
+        report = coordinator.wait(timeout=0.01)
+        self.assertEqual(report['results'], [])
+        self.assertEqual(report['pending'], list(range(6)))
+
+    def test_grid_checked_up_front(self):
+        """Test grid typos and unknown policies fail before any unit is leased."""
+        for grid in ({'TYPING_SPEDE': [0.0]}, {'scheduler_policy': ['lottery']},
+                     {'TYPING_SPEED': []}):
+            with self.assertRaises(SweepError):
+                expand_grid(grid)
+        self.assertEqual(len(expand_grid({'scheduler_policy': ['moderator'], 'repetitions': [2]})), 1)
+
+    def test_unsupported_parameter(self):
+        """Test units with parameters the simulation cannot apply are rejected."""
+        with self.assertRaises(SweepError):
+            run_unit({'API_KEYS': 1})
+
+    @patch.dict('config.API_KEYS', {provider: '' for provider in API_KEYS})
+    def test_run_unit(self):
+        """Test a unit runs the headless simulation without provider keys."""
+        summary = run_unit({'TYPING_SPEED': 0.0, 'PAUSE_BETWEEN_AGENTS': 1.0})
+        self.assertAlmostEqual(summary['duration'], 7.0)
+
+    def test_run_unit_agent_parameters(self):
+        """Test units can vary the scheduling policy and per-agent settings."""
+        base = {'TYPING_SPEED': 0.0, 'PAUSE_BETWEEN_AGENTS': 0.0}
+        self.assertAlmostEqual(run_unit(base)['duration'], 0.0)
+        slow = run_unit(dict(base, generation_latency={'alpha': 5.0},
+                             scheduler_policy='earliest_ready', priority={'alpha': 1}))
+        self.assertAlmostEqual(slow['duration'], 5.0)
+        with self.assertRaises(SimulationError):
+            run_unit(dict(base, scheduler_policy='lottery'))
+
+if __name__ == '__main__':
+    unittest.main()
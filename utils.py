@@ -1,6 +1,6 @@
 """Utility functions for the FARSI simulation."""
 import time
-from typing import Optional, Callable
+from typing import Optional, Callable, Sequence
 from functools import wraps
 
 
@@ -52,3 +52,60 @@ def format_timestamp() -> str:
         Formatted timestamp string
     """
     return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class VirtualClock:
+    """
+    Simulated clock exposing the `time()`/`sleep()` subset of the time module.
+    
+    Sleeping advances the clock instantly, so headless runs can simulate
+    hours of pacing in milliseconds.
+    """
+    
+    def __init__(self, start: float = 0.0):
+        """
+        Initialize the virtual clock.
+        
+        Args:
+            start: Initial clock reading in seconds
+        """
+        self.now = start
+    
+    def time(self) -> float:
+        """Return the current virtual time in seconds."""
+        return self.now
+    
+    def sleep(self, seconds: float):
+        """Advance the virtual time without blocking."""
+        if seconds > 0:
+            self.now += seconds
+
+
+class NullStream:
+    """Text sink used for headless rendering."""
+    
+    def write(self, text: str) -> int:
+        return len(text)
+    
+    def flush(self):
+        pass
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Compute a percentile using linear interpolation between closest ranks.
+    
+    Args:
+        values: Sample values (need not be sorted)
+        pct: Percentile to compute, between 0 and 100
+        
+    Returns:
+        The interpolated percentile, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)